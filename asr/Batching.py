@@ -0,0 +1,113 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import torch
+
+
+class InferenceBatcher:
+    def __init__(
+        self,
+        run_batch: Callable[[List[torch.Tensor]], Awaitable[List[torch.Tensor]]],
+        max_batch_size: int,
+        max_wait_ms: float,
+        concurrency: int = 1
+    ):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.concurrency = concurrency
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.slots: Optional[asyncio.Semaphore] = None
+        self.in_flight: Set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.items = 0
+        self.max_queue_depth = 0
+        self.wait_seconds = 0.0
+        self.forward_seconds = 0.0
+
+    def start(self):
+        if self.worker is None or self.worker.done():
+            self.queue = asyncio.Queue()
+            self.slots = asyncio.Semaphore(self.concurrency)
+            self.worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+        for task in list(self.in_flight):
+            task.cancel()
+
+    async def submit(self, chunk: torch.Tensor) -> torch.Tensor:
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((chunk, future, time.perf_counter()))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return await future
+
+    async def _collect(self) -> List[Tuple[torch.Tensor, asyncio.Future, float]]:
+        batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            # A free worker slot is taken before collecting, so while every worker
+            # is busy new chunks keep piling up into the next, fuller batch
+            await self.slots.acquire()
+            batch = await self._collect()
+            task = asyncio.create_task(self._execute(batch))
+            self.in_flight.add(task)
+            task.add_done_callback(self.in_flight.discard)
+
+    async def _execute(self, batch: List[Tuple[torch.Tensor, asyncio.Future, float]]):
+        started = time.perf_counter()
+        self.batches += 1
+        self.items += len(batch)
+        self.wait_seconds += sum(started - queued for _, _, queued in batch)
+
+        try:
+            results = await self.run_batch([chunk for chunk, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.forward_seconds += time.perf_counter() - started
+            self.slots.release()
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "batches_in_flight": len(self.in_flight),
+            "max_queue_depth": self.max_queue_depth,
+            "batches": self.batches,
+            "items": self.items,
+            "max_batch_size": self.max_batch_size,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "avg_batch_fill": self.items / (self.batches * self.max_batch_size) if self.batches else 0.0,
+            "avg_wait_ms": 1000 * self.wait_seconds / self.items if self.items else 0.0,
+            "avg_forward_ms": 1000 * self.forward_seconds / self.batches if self.batches else 0.0
+        }
@@ -0,0 +1,72 @@
+import asyncio
+from typing import Awaitable, Callable, List, Tuple
+import torch
+
+
+def split_windows(num_samples: int, window: int, overlap: int) -> List[Tuple[int, int]]:
+    if window <= 0 or overlap < 0 or overlap >= window:
+        raise ValueError("Chunk overlap must be non-negative and shorter than the window")
+
+    if num_samples <= window:
+        return [(0, num_samples)]
+
+    step = window - overlap
+    windows = []
+    start = 0
+    while start + window < num_samples:
+        windows.append((start, start + window))
+        start += step
+    # The last window is aligned to the end so the model never sees a short tail
+    windows.append((num_samples - window, num_samples))
+    return windows
+
+
+def stitch_ids(windows: List[Tuple[int, int]], chunk_ids: List[torch.Tensor]) -> torch.Tensor:
+    # Each window keeps frames up to the middle of the overlap with its neighbour:
+    # predictions near the window edges lack context and are less reliable
+    cuts = [windows[0][0]]
+    for (_, prev_end), (next_start, _) in zip(windows, windows[1:]):
+        cuts.append((prev_end + next_start) // 2)
+    cuts.append(windows[-1][1])
+
+    pieces = []
+    for i, ((start, end), ids) in enumerate(zip(windows, chunk_ids)):
+        ratio = ids.shape[-1] / max(end - start, 1)
+        first = int(round((cuts[i] - start) * ratio))
+        last = int(round((cuts[i + 1] - start) * ratio))
+        pieces.append(ids[first:last])
+    return torch.cat(pieces)
+
+
+def transcribe_chunked(
+    waveform: torch.Tensor,
+    predict_ids: Callable[[torch.Tensor], torch.Tensor],
+    sampling_rate: int,
+    window_seconds: float,
+    overlap_seconds: float
+) -> torch.Tensor:
+    window = int(window_seconds * sampling_rate)
+    overlap = int(overlap_seconds * sampling_rate)
+    windows = split_windows(waveform.shape[-1], window, overlap)
+
+    # Windows run one at a time and only token ids are kept from each,
+    # so peak model memory depends on the window length, not the recording
+    chunk_ids = [predict_ids(waveform[start:end]) for start, end in windows]
+    return stitch_ids(windows, chunk_ids)
+
+
+async def transcribe_chunked_async(
+    waveform: torch.Tensor,
+    predict_ids: Callable[[torch.Tensor], Awaitable[torch.Tensor]],
+    sampling_rate: int,
+    window_seconds: float,
+    overlap_seconds: float
+) -> torch.Tensor:
+    window = int(window_seconds * sampling_rate)
+    overlap = int(overlap_seconds * sampling_rate)
+    windows = split_windows(waveform.shape[-1], window, overlap)
+
+    # All windows are submitted at once so they can share batches with each other
+    # and with concurrent requests; slices are views, nothing is copied here
+    chunk_ids = await asyncio.gather(*(predict_ids(waveform[start:end]) for start, end in windows))
+    return stitch_ids(windows, list(chunk_ids))
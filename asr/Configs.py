@@ -0,0 +1,39 @@
+import os
+
+CHUNK_WINDOW_SECONDS: float = float(os.getenv("ASR_CHUNK_WINDOW_SECONDS", "20"))
+CHUNK_OVERLAP_SECONDS: float = float(os.getenv("ASR_CHUNK_OVERLAP_SECONDS", "2"))
+
+BATCH_MAX_SIZE: int = int(os.getenv("ASR_BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS: float = float(os.getenv("ASR_BATCH_MAX_WAIT_MS", "20"))
+
+MODEL_NAME: str = os.getenv("ASR_MODEL_NAME", "bond005/wav2vec2-large-ru-golos")
+MODEL_SAMPLING_RATE: int = 16000
+# "torch" runs Wav2Vec2ForCTC directly, "onnx" exports it once and serves it with ONNX Runtime
+MODEL_BACKEND: str = os.getenv("ASR_MODEL_BACKEND", "torch")
+ONNX_CACHE_DIR: str = os.getenv("ASR_ONNX_CACHE_DIR", os.path.join("Data", "onnx"))
+ONNX_INTER_OP_THREADS: int = int(os.getenv("ASR_ONNX_INTER_OP_THREADS", "1"))
+# "none" serves the fp32 model, "int8" applies dynamic quantization to its Linear layers
+MODEL_QUANTIZE: str = os.getenv("ASR_MODEL_QUANTIZE", "none")
+
+# "thread" shares one model between workers, "process" loads a copy per worker
+WORKER_KIND: str = os.getenv("ASR_WORKER_KIND", "thread")
+WORKER_COUNT: int = int(os.getenv("ASR_WORKER_COUNT", "1"))
+INTRA_OP_THREADS: int = int(os.getenv("ASR_INTRA_OP_THREADS", str(max(1, (os.cpu_count() or 1) // WORKER_COUNT))))
+
+VAD_ENABLED: bool = os.getenv("ASR_VAD_ENABLED", "1") == "1"
+VAD_FRAME_MS: int = int(os.getenv("ASR_VAD_FRAME_MS", "30"))
+VAD_MARGIN_DB: float = float(os.getenv("ASR_VAD_MARGIN_DB", "12"))
+VAD_MIN_SPEECH_MS: int = int(os.getenv("ASR_VAD_MIN_SPEECH_MS", "250"))
+VAD_MIN_SILENCE_MS: int = int(os.getenv("ASR_VAD_MIN_SILENCE_MS", "400"))
+VAD_PAD_MS: int = int(os.getenv("ASR_VAD_PAD_MS", "200"))
+
+TRANSCRIPT_CACHE_SIZE: int = int(os.getenv("ASR_TRANSCRIPT_CACHE_SIZE", "256"))
+# Empty string keeps the cache in memory only
+TRANSCRIPT_CACHE_DIR: str = os.getenv("ASR_TRANSCRIPT_CACHE_DIR", os.path.join("Data", "transcripts"))
+# The disk tier keeps at most this many transcripts, least recently used go first
+TRANSCRIPT_CACHE_DISK_SIZE: int = int(os.getenv("ASR_TRANSCRIPT_CACHE_DISK_SIZE", "5000"))
+TRANSCRIPT_CACHE_TTL_SECONDS: float = float(os.getenv("ASR_TRANSCRIPT_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+
+JOB_WORKERS: int = int(os.getenv("ASR_JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE: int = int(os.getenv("ASR_JOB_QUEUE_SIZE", "100"))
+JOB_TTL_SECONDS: float = float(os.getenv("ASR_JOB_TTL_SECONDS", "3600"))
@@ -0,0 +1,37 @@
+import io
+from typing import Optional
+import torch
+import torchaudio
+
+
+def detect_format(data: bytes) -> Optional[str]:
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return "wav"
+    if data[:4] == b"fLaC":
+        return "flac"
+    if data[:4] == b"OggS":
+        return "ogg"
+    if data[:3] == b"ID3" or (len(data) > 1 and data[0] == 0xFF and data[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return None
+
+
+def resample(waveform: torch.Tensor, orig_freq: int, new_freq: int) -> torch.Tensor:
+    return torchaudio.functional.resample(waveform, orig_freq=orig_freq, new_freq=new_freq)
+
+
+def decode_audio(data: bytes, sampling_rate: int) -> torch.Tensor:
+    audio_format = detect_format(data)
+    if audio_format is None:
+        raise ValueError("Unsupported file format")
+
+    # BytesIO over the upload buffer lets torchaudio decode without touching the disk
+    waveform, sr = torchaudio.load(io.BytesIO(data), format=audio_format)
+
+    if waveform.shape[0] > 1:
+        waveform = torch.mean(waveform, dim=0, keepdim=True)
+
+    if sr != sampling_rate:
+        waveform = resample(waveform, sr, sampling_rate)
+
+    return waveform.squeeze(0)
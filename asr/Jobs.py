@@ -0,0 +1,122 @@
+import asyncio
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+
+class Job:
+    def __init__(self, runner: Callable[["Job"], Awaitable[Dict[str, Any]]]):
+        self.id = uuid.uuid4().hex
+        self.runner = runner
+        self.status = "queued"
+        self.stage = "queued"
+        self.progress = 0.0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.changed = asyncio.Event()
+
+    def update(self, **fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+        # Waking the current watchers and handing new ones a fresh event
+        # is how every SSE stream learns about the change
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def report(self, stage: str, progress: float):
+        self.update(stage=stage, progress=round(progress, 3))
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "created": self.created,
+            "finished": self.finished
+        }
+
+
+class JobManager:
+    def __init__(self, workers: int, queue_size: int, ttl_seconds: float):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.ttl_seconds = ttl_seconds
+        self.jobs: Dict[str, Job] = {}
+        self.queue: Optional[asyncio.Queue] = None
+        self.tasks: List[asyncio.Task] = []
+
+    def start(self):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self.tasks.append(asyncio.create_task(self._expire()))
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def submit(self, runner: Callable[[Job], Awaitable[Dict[str, Any]]]) -> Job:
+        job = Job(runner)
+        # Raises asyncio.QueueFull, which the endpoint turns into 429
+        self.queue.put_nowait(job)
+        self.jobs[job.id] = job
+        return job
+
+    def finished(self, result: Dict[str, Any]) -> Job:
+        job = Job(None)
+        job.update(status="done", stage="done", progress=1.0, result=result, finished=time.time())
+        self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def watch(self, job: Job) -> AsyncIterator[Dict[str, Any]]:
+        while True:
+            changed = job.changed
+            yield job.snapshot()
+            if job.done:
+                return
+            await changed.wait()
+
+    async def _work(self):
+        while True:
+            job = await self.queue.get()
+            job.update(status="running")
+            try:
+                result = await job.runner(job)
+            except Exception as e:
+                job.update(status="failed", stage="failed", error=str(e), finished=time.time())
+            else:
+                job.update(status="done", stage="done", progress=1.0, result=result, finished=time.time())
+            finally:
+                job.runner = None
+                self.queue.task_done()
+
+    async def _expire(self):
+        while True:
+            await asyncio.sleep(min(60.0, self.ttl_seconds))
+            deadline = time.time() - self.ttl_seconds
+            for job_id in [job_id for job_id, job in self.jobs.items() if job.finished and job.finished < deadline]:
+                del self.jobs[job_id]
+
+    def metrics(self) -> Dict[str, Any]:
+        statuses: Dict[str, int] = {}
+        for job in self.jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "queue_size": self.queue_size,
+            "jobs": statuses
+        }
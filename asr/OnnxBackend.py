@@ -0,0 +1,70 @@
+import os
+import numpy as np
+import onnxruntime
+import torch
+from transformers import Wav2Vec2Config, Wav2Vec2ForCTC
+
+
+class LogitsOnly(torch.nn.Module):
+    def __init__(self, model: Wav2Vec2ForCTC):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_values, attention_mask):
+        return self.model(input_values, attention_mask=attention_mask).logits
+
+
+def onnx_path(cache_dir: str, model_name: str) -> str:
+    return os.path.join(cache_dir, model_name.replace("/", "__") + ".onnx")
+
+
+def export_onnx(model_name: str, path: str):
+    model = Wav2Vec2ForCTC.from_pretrained(model_name).eval()
+    input_values = torch.zeros(1, 16000)
+    attention_mask = torch.ones(1, 16000, dtype=torch.long)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Workers of a process pool may race to export; each writes its own file
+    # and the atomic rename makes whichever finishes last the cached artifact
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    torch.onnx.export(
+        LogitsOnly(model),
+        (input_values, attention_mask),
+        temp_path,
+        input_names=["input_values", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_values": {0: "batch", 1: "samples"},
+            "attention_mask": {0: "batch", 1: "samples"},
+            "logits": {0: "batch", 1: "frames"}
+        },
+        opset_version=14
+    )
+    os.replace(temp_path, path)
+
+
+class OnnxCtcModel:
+    def __init__(self, model_name: str, cache_dir: str, intra_op_threads: int, inter_op_threads: int):
+        path = onnx_path(cache_dir, model_name)
+        if not os.path.exists(path):
+            export_onnx(model_name, path)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.config = Wav2Vec2Config.from_pretrained(model_name)
+
+    def logits(self, input_values: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        outputs = self.session.run(["logits"], {
+            "input_values": input_values.numpy().astype(np.float32),
+            "attention_mask": attention_mask.numpy().astype(np.int64)
+        })
+        return torch.from_numpy(outputs[0])
+
+    def output_lengths(self, input_lengths: torch.Tensor) -> torch.Tensor:
+        # Same formula as Wav2Vec2ForCTC._get_feat_extract_output_lengths
+        for kernel, stride in zip(self.config.conv_kernel, self.config.conv_stride):
+            input_lengths = torch.div(input_lengths - kernel, stride, rounding_mode="floor") + 1
+        return input_lengths
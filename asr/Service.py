@@ -0,0 +1,126 @@
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import torch
+from asr.Configs import (
+    BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, MODEL_NAME, MODEL_SAMPLING_RATE, MODEL_BACKEND, MODEL_QUANTIZE,
+    WORKER_KIND, WORKER_COUNT, INTRA_OP_THREADS,
+    VAD_FRAME_MS, VAD_MARGIN_DB, VAD_MIN_SPEECH_MS, VAD_MIN_SILENCE_MS, VAD_PAD_MS
+)
+from asr.Batching import InferenceBatcher
+from asr.Chunking import transcribe_chunked_async
+from asr.Streaming import StreamingTranscriber
+from asr import Workers
+
+
+class AsrService:
+    def __init__(self):
+        self.pool = Workers.create_pool(
+            WORKER_KIND, WORKER_COUNT, MODEL_NAME, MODEL_BACKEND, MODEL_QUANTIZE, INTRA_OP_THREADS
+        )
+        self.batchers: Dict[int, InferenceBatcher] = {}
+
+    def warm_up(self):
+        # One call per worker so every thread or process loads its model now
+        # instead of on the first request it happens to receive
+        futures = [self.pool.submit(Workers.warm_up) for _ in range(WORKER_COUNT)]
+        for future in futures:
+            future.result()
+
+    async def stop(self):
+        for batcher in self.batchers.values():
+            await batcher.stop()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, func, *args) -> Any:
+        return await Workers.run_in_pool(self.pool, func, *args)
+
+    def batcher(self, sampling_rate: int) -> InferenceBatcher:
+        if sampling_rate not in self.batchers:
+            async def run_batch(chunks):
+                return await self.run(Workers.predict_ids_batch, chunks, sampling_rate)
+
+            self.batchers[sampling_rate] = InferenceBatcher(run_batch, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, WORKER_COUNT)
+        return self.batchers[sampling_rate]
+
+    async def transcribe(
+        self,
+        content: bytes,
+        sampling_rate: int,
+        chunk_length_s: float,
+        chunk_overlap_s: float,
+        vad: bool,
+        progress: Optional[Callable[[str, float], None]] = None
+    ) -> Dict[str, Any]:
+        report = progress or (lambda stage, fraction: None)
+        report("decoding", 0.0)
+        waveform = await self.run(Workers.decode_audio, content, sampling_rate)
+        total = waveform.shape[-1]
+
+        if vad:
+            speech: List[Tuple[int, int]] = await self.run(
+                Workers.detect_speech, waveform, sampling_rate,
+                VAD_FRAME_MS, VAD_MARGIN_DB, VAD_MIN_SPEECH_MS, VAD_MIN_SILENCE_MS, VAD_PAD_MS
+            )
+        else:
+            speech = [(0, total)] if total else []
+
+        batcher = self.batcher(sampling_rate)
+        speech_samples = sum(end - start for start, end in speech)
+        done_samples = 0
+        report("transcribing", 0.0)
+
+        async def transcribe_segment(start: int, end: int) -> torch.Tensor:
+            nonlocal done_samples
+            ids = await transcribe_chunked_async(
+                waveform[start:end], batcher.submit, sampling_rate, chunk_length_s, chunk_overlap_s
+            )
+            done_samples += end - start
+            report("transcribing", done_samples / speech_samples)
+            return ids
+
+        segment_ids = await asyncio.gather(*(transcribe_segment(start, end) for start, end in speech))
+        texts = await self.run(Workers.decode_segments, list(segment_ids))
+
+        return {
+            "raw_text": " ".join(text for text in texts if text),
+            "segments": [
+                {"start": start / sampling_rate, "end": end / sampling_rate, "text": text}
+                for (start, end), text in zip(speech, texts)
+            ],
+            "duration_seconds": total / sampling_rate,
+            "skipped_seconds": (total - speech_samples) / sampling_rate,
+            "skipped_ratio": (total - speech_samples) / total if total else 0.0
+        }
+
+    def open_stream(self, sampling_rate: int, chunk_length_s: float, chunk_overlap_s: float) -> StreamingTranscriber:
+        batcher = self.batcher(MODEL_SAMPLING_RATE)
+
+        async def predict(chunk: torch.Tensor) -> torch.Tensor:
+            if sampling_rate != MODEL_SAMPLING_RATE:
+                chunk = await self.run(Workers.resample, chunk, sampling_rate, MODEL_SAMPLING_RATE)
+            return await batcher.submit(chunk)
+
+        return StreamingTranscriber(predict, sampling_rate, chunk_length_s, chunk_overlap_s)
+
+    async def decode_stream(self, transcriber: StreamingTranscriber) -> str:
+        return await self.run(Workers.decode_ids, transcriber.transcript_ids())
+
+    async def decode_stream_segment(self, transcriber: StreamingTranscriber) -> str:
+        # Only the newly committed ids are decoded, so a partial costs the
+        # same at the start of a meeting and an hour into it
+        ids = transcriber.take_new_ids()
+        text, consumed = await self.run(Workers.decode_complete_words, ids)
+        transcriber.hold_back(ids, consumed)
+        return text
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "pool": {
+                "kind": WORKER_KIND,
+                "workers": WORKER_COUNT,
+                "intra_op_threads": INTRA_OP_THREADS,
+                "backend": MODEL_BACKEND,
+                "quantize": MODEL_QUANTIZE
+            },
+            "batchers": {str(rate): batcher.metrics() for rate, batcher in self.batchers.items()}
+        }
@@ -0,0 +1,105 @@
+from typing import Awaitable, Callable, List
+import numpy as np
+import torch
+
+FRAME_DTYPES = {
+    "pcm_s16le": np.int16,
+    "pcm_f32le": np.float32
+}
+
+
+def decode_frame(frame: bytes, encoding: str) -> torch.Tensor:
+    if encoding not in FRAME_DTYPES:
+        raise ValueError(f"Unsupported frame encoding: {encoding}")
+
+    samples = np.frombuffer(frame, dtype=FRAME_DTYPES[encoding])
+    if encoding == "pcm_s16le":
+        samples = samples.astype(np.float32) / 32768.0
+    return torch.from_numpy(samples.copy())
+
+
+class StreamingTranscriber:
+    def __init__(
+        self,
+        predict_ids: Callable[[torch.Tensor], Awaitable[torch.Tensor]],
+        sampling_rate: int,
+        window_seconds: float,
+        overlap_seconds: float
+    ):
+        self.predict_ids = predict_ids
+        self.sampling_rate = sampling_rate
+        self.window = int(window_seconds * sampling_rate)
+        self.overlap = int(overlap_seconds * sampling_rate)
+        if self.window <= 0 or self.overlap < 0 or self.overlap >= self.window:
+            raise ValueError("Chunk overlap must be non-negative and shorter than the window")
+
+        self.buffer = torch.zeros(0)
+        # Incoming frames wait here and are joined only once a window is full,
+        # so a long meeting does not re-copy the buffer on every frame
+        self.pending: List[torch.Tensor] = []
+        self.pending_samples = 0
+        self.committed_ids: List[torch.Tensor] = []
+        self.committed_samples = 0
+        self.first_window = True
+        # Partial results: committed windows not yet reported, and the ids
+        # held back after the last complete word
+        self.reported = 0
+        self.held_ids = torch.zeros(0, dtype=torch.long)
+
+    def _flush_pending(self):
+        if self.pending:
+            self.buffer = torch.cat([self.buffer, *self.pending])
+            self.pending = []
+            self.pending_samples = 0
+
+    async def push(self, samples: torch.Tensor) -> bool:
+        self.pending.append(samples)
+        self.pending_samples += samples.shape[-1]
+        if self.buffer.shape[-1] + self.pending_samples < self.window:
+            return False
+
+        self._flush_pending()
+        committed = False
+        while self.buffer.shape[-1] >= self.window:
+            await self._commit(self.buffer[:self.window], final=False)
+            self.buffer = self.buffer[self.window - self.overlap:]
+            committed = True
+        return committed
+
+    async def finish(self):
+        self._flush_pending()
+        # Tails shorter than a tenth of a second carry no speech worth a forward pass
+        left = 0 if self.first_window else self.overlap // 2
+        if self.buffer.shape[-1] - left >= self.sampling_rate // 10:
+            await self._commit(self.buffer, final=True)
+        self.buffer = torch.zeros(0)
+
+    async def _commit(self, chunk: torch.Tensor, final: bool):
+        # Same cut rule as the offline stitcher: a window owns the frames from
+        # the middle of its left overlap to the middle of its right overlap
+        left = 0 if self.first_window else self.overlap // 2
+        right = chunk.shape[-1] if final else chunk.shape[-1] - self.overlap // 2
+
+        ids = await self.predict_ids(chunk)
+        ratio = ids.shape[-1] / max(chunk.shape[-1], 1)
+        self.committed_ids.append(ids[int(round(left * ratio)):int(round(right * ratio))])
+        self.committed_samples += right - left
+        self.first_window = False
+
+    def take_new_ids(self) -> torch.Tensor:
+        # The ids committed since the previous call, after the ones held back then
+        new_ids = self.committed_ids[self.reported:]
+        self.reported = len(self.committed_ids)
+        return torch.cat([self.held_ids, *new_ids]) if new_ids else self.held_ids
+
+    def hold_back(self, ids: torch.Tensor, consumed: int):
+        self.held_ids = ids[consumed:]
+
+    def transcript_ids(self) -> torch.Tensor:
+        if not self.committed_ids:
+            return torch.zeros(0, dtype=torch.long)
+        return torch.cat(self.committed_ids)
+
+    @property
+    def committed_seconds(self) -> float:
+        return self.committed_samples / self.sampling_rate
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class TranscriptCache:
+    def __init__(self, max_entries: int, disk_dir: str = "", max_disk_entries: int = 0, ttl_seconds: float = 0):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Files of the disk tier by last use, oldest first; built from the
+        # directory on first use, then kept up to date by get/put
+        self.disk_entries: "Optional[OrderedDict[str, float]]" = None
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(content: bytes, params: Dict[str, Any]) -> str:
+        digest = hashlib.sha256(content)
+        digest.update(json.dumps(params, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], key + ".json")
+
+    def _disk_index(self) -> "OrderedDict[str, float]":
+        if self.disk_entries is None:
+            found = []
+            for root, _, files in os.walk(self.disk_dir):
+                for name in files:
+                    if name.endswith(".json"):
+                        try:
+                            found.append((os.path.getmtime(os.path.join(root, name)), name[:-len(".json")]))
+                        except OSError:
+                            pass
+            self.disk_entries = OrderedDict((key, used) for used, key in sorted(found))
+        return self.disk_entries
+
+    def _expired(self, used: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - used > self.ttl_seconds
+
+    def _touch_disk(self, key: str) -> list:
+        # Marks key as just used and returns the files that fell out of the
+        # tier, expired or over the size bound; the caller deletes them
+        with self.lock:
+            index = self._disk_index()
+            index[key] = time.time()
+            index.move_to_end(key)
+            stale = []
+            while index:
+                oldest, used = next(iter(index.items()))
+                if not self._expired(used) and (self.max_disk_entries <= 0 or len(index) <= self.max_disk_entries):
+                    break
+                index.popitem(last=False)
+                stale.append(oldest)
+            self.evictions += len(stale)
+            return stale
+
+    def _delete(self, keys: list):
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+
+        if self.disk_dir:
+            path = self._path(key)
+            with self.lock:
+                used = self._disk_index().get(key)
+            if used is None and os.path.exists(path):
+                # Written by another worker process after our index was built
+                used = os.path.getmtime(path)
+            if used is not None and self._expired(used):
+                with self.lock:
+                    self._disk_index().pop(key, None)
+                    self.evictions += 1
+                self._delete([key])
+            elif used is not None:
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        value = json.load(f)
+                    os.utime(path)
+                except (OSError, ValueError) as e:
+                    print(f"[ERROR] Не удалось прочитать кэш расшифровки {key}: {e}")
+                else:
+                    self._remember(key, value)
+                    self._delete(self._touch_disk(key))
+                    with self.lock:
+                        self.disk_hits += 1
+                    return value
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: Dict[str, Any]):
+        self._remember(key, value)
+        if not self.disk_dir:
+            return
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"[ERROR] Не удалось сохранить кэш расшифровки {key}: {e}")
+            return
+        self._delete(self._touch_disk(key))
+
+    def _remember(self, key: str, value: Dict[str, Any]):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "disk_tier": bool(self.disk_dir),
+            "disk_entries": len(self.disk_entries) if self.disk_entries is not None else None,
+            "max_disk_entries": self.max_disk_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": self.evictions,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0
+        }
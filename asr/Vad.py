@@ -0,0 +1,61 @@
+from typing import List, Tuple
+import torch
+
+
+def frame_energy_db(waveform: torch.Tensor, frame: int) -> torch.Tensor:
+    count = waveform.shape[-1] // frame
+    frames = waveform[:count * frame].reshape(count, frame)
+    return 10 * torch.log10(frames.pow(2).mean(dim=-1) + 1e-10)
+
+
+def merge_segments(segments: List[Tuple[int, int]], max_gap: int) -> List[Tuple[int, int]]:
+    merged = []
+    for start, end in segments:
+        if merged and start - merged[-1][1] <= max_gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def detect_speech(
+    waveform: torch.Tensor,
+    sampling_rate: int,
+    frame_ms: int,
+    margin_db: float,
+    min_speech_ms: int,
+    min_silence_ms: int,
+    pad_ms: int
+) -> List[Tuple[int, int]]:
+    total = waveform.shape[-1]
+    frame = max(1, sampling_rate * frame_ms // 1000)
+    energy = frame_energy_db(waveform, frame)
+    if energy.numel() == 0:
+        return [(0, total)] if total else []
+
+    noise_floor = torch.quantile(energy, 0.1).item()
+    loud_level = torch.quantile(energy, 0.9).item()
+    # A narrow dynamic range means the recording is all speech or all noise;
+    # the energy threshold cannot tell them apart, so nothing is skipped
+    if loud_level - noise_floor < margin_db:
+        return [(0, total)]
+
+    speech = (energy > noise_floor + margin_db).tolist()
+    segments = []
+    start = None
+    for i, is_speech in enumerate(speech + [False]):
+        if is_speech and start is None:
+            start = i
+        elif not is_speech and start is not None:
+            segments.append((start * frame, i * frame))
+            start = None
+
+    segments = merge_segments(segments, sampling_rate * min_silence_ms // 1000)
+    min_speech = sampling_rate * min_speech_ms // 1000
+    pad = sampling_rate * pad_ms // 1000
+    segments = [
+        (max(0, start - pad), min(total, end + pad))
+        for start, end in segments
+        if end - start >= min_speech
+    ]
+    return merge_segments(segments, 0)
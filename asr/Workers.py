@@ -0,0 +1,125 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Tuple
+import torch
+from transformers import Wav2Vec2ForCTC, Wav2Vec2Processor
+from asr.Decoding import decode_audio, resample
+from asr.Vad import detect_speech
+from asr.Configs import ONNX_CACHE_DIR, ONNX_INTER_OP_THREADS
+
+# Model state of the current process. In thread mode every worker thread
+# shares it, in process mode each worker process loads its own copy.
+_pipeline = {}
+_pipeline_lock = threading.Lock()
+
+
+def init_worker(model_name: str, backend: str, quantize: str, intra_op_threads: int):
+    torch.set_num_threads(intra_op_threads)
+    load_pipeline(model_name, backend, quantize, intra_op_threads)
+
+
+def quantize_model(model: Wav2Vec2ForCTC, quantize: str) -> Wav2Vec2ForCTC:
+    if quantize == "none":
+        return model
+    if quantize == "int8":
+        # Dynamic quantization keeps activations in fp32 and stores Linear weights
+        # as int8; the conv feature encoder is left untouched
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    raise ValueError(f"Unknown ASR quantization mode: {quantize}")
+
+
+def load_torch_model(model_name: str, quantize: str):
+    model = quantize_model(Wav2Vec2ForCTC.from_pretrained(model_name).eval(), quantize)
+
+    def logits(input_values, attention_mask):
+        with torch.no_grad():
+            return model(input_values, attention_mask=attention_mask).logits
+
+    return logits, model._get_feat_extract_output_lengths
+
+
+def load_onnx_model(model_name: str, quantize: str, intra_op_threads: int):
+    if quantize != "none":
+        raise ValueError("Quantization is only supported by the torch backend")
+
+    from asr.OnnxBackend import OnnxCtcModel
+    model = OnnxCtcModel(model_name, ONNX_CACHE_DIR, intra_op_threads, ONNX_INTER_OP_THREADS)
+    return model.logits, model.output_lengths
+
+
+def load_pipeline(model_name: str, backend: str = "torch", quantize: str = "none", intra_op_threads: int = 1):
+    with _pipeline_lock:
+        if "logits" not in _pipeline:
+            _pipeline["processor"] = Wav2Vec2Processor.from_pretrained(model_name)
+            if backend == "torch":
+                _pipeline["logits"], _pipeline["output_lengths"] = load_torch_model(model_name, quantize)
+            elif backend == "onnx":
+                _pipeline["logits"], _pipeline["output_lengths"] = load_onnx_model(model_name, quantize, intra_op_threads)
+            else:
+                raise ValueError(f"Unknown ASR backend: {backend}")
+    return _pipeline["processor"]
+
+
+def warm_up() -> bool:
+    return "logits" in _pipeline
+
+
+def predict_ids_batch(chunks: List[torch.Tensor], sampling_rate: int) -> List[torch.Tensor]:
+    processor = _pipeline["processor"]
+    inputs = processor(
+        [chunk.numpy() for chunk in chunks],
+        return_tensors="pt",
+        sampling_rate=sampling_rate,
+        padding=True,
+        return_attention_mask=True
+    )
+
+    logits = _pipeline["logits"](inputs.input_values, inputs.attention_mask)
+
+    predicted_ids = torch.argmax(logits, dim=-1)
+    lengths = _pipeline["output_lengths"](inputs.attention_mask.sum(dim=-1))
+    return [predicted_ids[i, :lengths[i]] for i in range(len(chunks))]
+
+
+def decode_ids(predicted_ids: torch.Tensor) -> str:
+    return _pipeline["processor"].batch_decode(predicted_ids.unsqueeze(0))[0]
+
+
+def decode_complete_words(predicted_ids: torch.Tensor) -> Tuple[str, int]:
+    # Decodes up to the last word delimiter and reports how many ids that
+    # took; the rest may be a word cut by the window edge
+    delimiter = _pipeline["processor"].tokenizer.word_delimiter_token_id
+    positions = (predicted_ids == delimiter).nonzero()
+    if len(positions) == 0:
+        return "", 0
+    end = int(positions[-1]) + 1
+    return _pipeline["processor"].decode(predicted_ids[:end]), end
+
+
+def decode_segments(segment_ids: List[torch.Tensor]) -> List[str]:
+    return [_pipeline["processor"].decode(ids) for ids in segment_ids]
+
+
+def create_pool(kind: str, workers: int, model_name: str, backend: str, quantize: str, intra_op_threads: int) -> Executor:
+    if kind == "process":
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(model_name, backend, quantize, intra_op_threads)
+        )
+    if kind == "thread":
+        # torch.set_num_threads is process-wide, so all threads share the same setting
+        return ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="asr",
+            initializer=init_worker,
+            initargs=(model_name, backend, quantize, intra_op_threads)
+        )
+    raise ValueError(f"Unknown ASR worker kind: {kind}")
+
+
+async def run_in_pool(pool: Executor, func: Callable, *args) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
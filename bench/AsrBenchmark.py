@@ -0,0 +1,144 @@
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import time
+from typing import Dict, List
+
+# Every mode is a backend:quantize pair and runs in a fresh spawned process
+# so that peak RSS is measured for that model alone.
+# Usage: python -m bench.AsrBenchmark --samples <dir> --modes torch:none torch:int8 onnx:none
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.ogg', '.flac')
+
+
+def word_errors(reference: str, hypothesis: str) -> int:
+    ref, hyp = reference.lower().split(), hypothesis.lower().split()
+    row = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (ref_word != hyp_word))
+    return row[-1]
+
+
+def wer(references: List[str], hypotheses: List[str]) -> float:
+    words = sum(len(ref.split()) for ref in references)
+    errors = sum(word_errors(ref, hyp) for ref, hyp in zip(references, hypotheses))
+    return errors / words if words else 0.0
+
+
+def run_mode(args, mode: str, results):
+    import torch
+    from asr import Workers
+    from asr.Chunking import transcribe_chunked
+
+    backend, quantize = mode.split(':')
+    torch.set_num_threads(args.threads)
+    started = time.perf_counter()
+    Workers.load_pipeline(args.model, backend, quantize, args.threads)
+    load_seconds = time.perf_counter() - started
+
+    transcripts = {}
+    audio_seconds = 0.0
+    inference_seconds = 0.0
+    for name in args.files:
+        with open(os.path.join(args.samples, name), 'rb') as f:
+            content = f.read()
+
+        started = time.perf_counter()
+        waveform = Workers.decode_audio(content, args.sampling_rate)
+        ids = transcribe_chunked(
+            waveform,
+            lambda chunk: Workers.predict_ids_batch([chunk], args.sampling_rate)[0],
+            args.sampling_rate,
+            args.window,
+            args.overlap
+        )
+        transcripts[name] = Workers.decode_ids(ids)
+        inference_seconds += time.perf_counter() - started
+        audio_seconds += waveform.shape[-1] / args.sampling_rate
+
+    results[mode] = {
+        "load_seconds": load_seconds,
+        "audio_seconds": audio_seconds,
+        "inference_seconds": inference_seconds,
+        "rtf": inference_seconds / audio_seconds if audio_seconds else 0.0,
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "transcripts": transcripts
+    }
+
+
+def load_references(samples: str, files: List[str]) -> Dict[str, str]:
+    references = {}
+    for name in files:
+        path = os.path.join(samples, os.path.splitext(name)[0] + '.txt')
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                references[name] = f.read().strip()
+    return references
+
+
+def main():
+    from asr.Configs import MODEL_NAME, CHUNK_WINDOW_SECONDS, CHUNK_OVERLAP_SECONDS, INTRA_OP_THREADS
+
+    parser = argparse.ArgumentParser(description="ASR backend and quantization benchmark")
+    parser.add_argument('--samples', required=True, help="directory with audio files and optional .txt references")
+    parser.add_argument('--model', default=MODEL_NAME)
+    parser.add_argument('--modes', nargs='+', default=['torch:none', 'torch:int8'])
+    parser.add_argument('--sampling-rate', type=int, default=16000)
+    parser.add_argument('--window', type=float, default=CHUNK_WINDOW_SECONDS)
+    parser.add_argument('--overlap', type=float, default=CHUNK_OVERLAP_SECONDS)
+    parser.add_argument('--threads', type=int, default=INTRA_OP_THREADS)
+    parser.add_argument('--output', help="write the full report with transcripts to this JSON file")
+    args = parser.parse_args()
+
+    args.files = sorted(name for name in os.listdir(args.samples) if name.lower().endswith(AUDIO_EXTENSIONS))
+    if not args.files:
+        raise SystemExit(f"No audio files found in {args.samples}")
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Manager().dict()
+    for mode in args.modes:
+        process = context.Process(target=run_mode, args=(args, mode, results))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            raise SystemExit(f"Benchmark for mode {mode} failed")
+
+    report = dict(results)
+    references = load_references(args.samples, args.files)
+    baseline = report[args.modes[0]]["transcripts"]
+    for mode in args.modes:
+        transcripts = report[mode]["transcripts"]
+        report[mode]["wer_drift"] = wer(
+            [baseline[name] for name in args.files],
+            [transcripts[name] for name in args.files]
+        )
+        report[mode]["identical"] = sum(baseline[name] == transcripts[name] for name in args.files)
+        if references:
+            report[mode]["wer_vs_reference"] = wer(
+                [references[name] for name in references],
+                [transcripts[name] for name in references]
+            )
+
+    print(f"WER drift and identical transcripts are measured against {args.modes[0]}")
+    print(f"{'mode':<12}{'rtf':>8}{'peak rss, MB':>15}{'load, s':>10}{'wer drift':>12}{'identical':>11}{'wer ref':>10}")
+    for mode in args.modes:
+        row = report[mode]
+        wer_ref = row.get("wer_vs_reference")
+        print(
+            f"{mode:<12}{row['rtf']:>8.3f}{row['peak_rss_mb']:>15.0f}{row['load_seconds']:>10.1f}"
+            f"{row['wer_drift']:>12.3%}{row['identical']:>6}/{len(args.files):<4}"
+            f"{(f'{wer_ref:.3%}' if wer_ref is not None else '-'):>10}"
+        )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
+
+
+if __name__ == "__main__":
+    main()
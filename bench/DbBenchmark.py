@@ -0,0 +1,348 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+import asyncmy
+from common.Stats import percentile
+from db.Conferences import fetch_subthemes, create_conference_rows, update_conference_rows
+
+# Round trips and latency of the conference queries against a local MySQL
+# filled with synthetic data. Use a throwaway database, the tables are
+# created (and with --seed refilled) there. --rtt-ms adds a sleep to every
+# statement to emulate the network distance to the production host. Both
+# the read path (get_conference) and the write path (create/update_conference)
+# are measured with the old per-row code and the current one, e.g.:
+#   python -m bench.DbBenchmark --database awaks_bench --seed --subthemes 40 --rtt-ms 20
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS Roles (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL)""",
+    """CREATE TABLE IF NOT EXISTS Users (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(255), surname VARCHAR(255), patronomic VARCHAR(255),
+        role_id INT, telephone VARCHAR(64), email VARCHAR(255), password VARCHAR(255))""",
+    """CREATE TABLE IF NOT EXISTS Categories (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL)""",
+    """CREATE TABLE IF NOT EXISTS Conferences (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(255), description TEXT,
+        original_text LONGTEXT, improved_text LONGTEXT, text_hash CHAR(32))""",
+    """CREATE TABLE IF NOT EXISTS ConferenceCategories (
+        conference_id INT, category_id INT,
+        INDEX (conference_id))""",
+    """CREATE TABLE IF NOT EXISTS Subthemes (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        conference_id INT, name VARCHAR(255), description TEXT, type_id INT,
+        INDEX (conference_id))""",
+    """CREATE TABLE IF NOT EXISTS UsersSubthemes (
+        subtheme INT, user INT,
+        INDEX (subtheme))"""
+]
+
+
+class CountingCursor:
+    def __init__(self, cursor, rtt: float):
+        self.cursor = cursor
+        self.rtt = rtt
+        self.round_trips = 0
+
+    async def execute(self, query: str, args: Any = None):
+        self.round_trips += 1
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+        return await self.cursor.execute(query, args)
+
+    async def executemany(self, query: str, args: Any):
+        self.round_trips += 1
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+        return await self.cursor.executemany(query, args)
+
+    def __getattr__(self, name: str):
+        return getattr(self.cursor, name)
+
+
+async def fetch_subthemes_per_row(cursor, conference_id: int) -> List[Dict[str, Any]]:
+    # The loader get_conference used before: one users query per subtheme
+    await cursor.execute(
+        "SELECT id, name, description, type_id FROM Subthemes WHERE conference_id = %s",
+        (conference_id,)
+    )
+    subthemes = []
+    columns = [col[0] for col in cursor.description]
+    for row in await cursor.fetchall():
+        subtheme = dict(zip(columns, row))
+        await cursor.execute(
+            """SELECT u.id, u.name, u.surname, u.patronomic,
+                      u.role_id, u.telephone, u.email
+               FROM Users u
+               JOIN UsersSubthemes su ON u.id = su.user
+               WHERE su.subtheme = %s""",
+            (subtheme['id'],)
+        )
+        user_columns = [col[0] for col in cursor.description]
+        subtheme['users'] = [dict(zip(user_columns, row)) for row in await cursor.fetchall()]
+        subthemes.append(subtheme)
+    return subthemes
+
+
+async def create_conference_per_row(cursor, data: Any) -> int:
+    # The writes create_conference issued before: one statement per row
+    await cursor.execute(
+        "INSERT INTO Conferences (name, description, original_text, improved_text) VALUES (%s, %s, %s, %s)",
+        (data.name, data.description, data.original_text, data.improved_text)
+    )
+    conference_id = cursor.lastrowid
+    for category_id in data.categories:
+        await cursor.execute(
+            "INSERT INTO ConferenceCategories (conference_id, category_id) VALUES (%s, %s)",
+            (conference_id, category_id)
+        )
+    for subtheme in data.subthemes:
+        await cursor.execute(
+            "INSERT INTO Subthemes (conference_id, name, description, type_id) VALUES (%s, %s, %s, %s)",
+            (conference_id, subtheme.name, subtheme.description, subtheme.type_id)
+        )
+        subtheme_id = cursor.lastrowid
+        for user_id in subtheme.user_ids:
+            await cursor.execute(
+                "INSERT INTO UsersSubthemes (subtheme, user) VALUES (%s, %s)",
+                (subtheme_id, user_id)
+            )
+    return conference_id
+
+
+async def update_conference_per_row(cursor, conference_id: int, data: Any):
+    # The writes update_conference issued before, with subtheme ids honoured
+    await cursor.execute(
+        "UPDATE Conferences SET name = %s, description = %s, original_text = %s, improved_text = %s WHERE id = %s",
+        (data.name, data.description, data.original_text, data.improved_text, conference_id)
+    )
+    await cursor.execute("SELECT id FROM Subthemes WHERE conference_id = %s", (conference_id,))
+    old_ids = [row[0] for row in await cursor.fetchall()]
+    new_ids = []
+    for subtheme in data.subthemes:
+        if subtheme.id:
+            await cursor.execute(
+                "UPDATE Subthemes SET name = %s, description = %s, type_id = %s WHERE id = %s",
+                (subtheme.name, subtheme.description, subtheme.type_id, subtheme.id)
+            )
+            subtheme_id = subtheme.id
+        else:
+            await cursor.execute(
+                "INSERT INTO Subthemes (conference_id, name, description, type_id) VALUES (%s, %s, %s, %s)",
+                (conference_id, subtheme.name, subtheme.description, subtheme.type_id)
+            )
+            subtheme_id = cursor.lastrowid
+        new_ids.append(subtheme_id)
+        await cursor.execute("DELETE FROM UsersSubthemes WHERE subtheme = %s", (subtheme_id,))
+        for user_id in subtheme.user_ids:
+            await cursor.execute(
+                "INSERT INTO UsersSubthemes (subtheme, user) VALUES (%s, %s)",
+                (subtheme_id, user_id)
+            )
+    for old_id in old_ids:
+        if old_id not in new_ids:
+            await cursor.execute("DELETE FROM Subthemes WHERE id = %s", (old_id,))
+
+
+async def seed(conn, args: argparse.Namespace):
+    async with conn.cursor() as cursor:
+        for table in ("UsersSubthemes", "Subthemes", "ConferenceCategories", "Conferences", "Users", "Roles", "Categories"):
+            await cursor.execute(f"DELETE FROM {table}")
+        await cursor.executemany("INSERT INTO Roles (name) VALUES (%s)", [("Участник",), ("Ведущий",)])
+        await cursor.executemany("INSERT INTO Categories (name) VALUES (%s)", [(f"Категория {i}",) for i in range(5)])
+        await cursor.executemany(
+            """INSERT INTO Users (name, surname, patronomic, role_id, telephone, email, password)
+               VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+            [(f"Имя {i}", f"Фамилия {i}", None, 1, f"+7900{i:07d}", f"user{i}@example.com", "")
+             for i in range(args.users)]
+        )
+        await cursor.execute("SELECT id FROM Users")
+        user_ids = [row[0] for row in await cursor.fetchall()]
+
+        text = "Синтетическая расшифровка совещания. " * 2000
+        for c in range(args.conferences):
+            await cursor.execute(
+                "INSERT INTO Conferences (name, description, original_text, improved_text) VALUES (%s, %s, %s, %s)",
+                (f"Совещание {c}", "Описание", text, text)
+            )
+            conference_id = cursor.lastrowid
+            for s in range(args.subthemes):
+                await cursor.execute(
+                    "INSERT INTO Subthemes (conference_id, name, description, type_id) VALUES (%s, %s, %s, %s)",
+                    (conference_id, f"Подтема {s}", "Описание подтемы", 1)
+                )
+                subtheme_id = cursor.lastrowid
+                await cursor.executemany(
+                    "INSERT INTO UsersSubthemes (subtheme, user) VALUES (%s, %s)",
+                    [(subtheme_id, user_id) for user_id in random.sample(user_ids, min(args.participants, len(user_ids)))]
+                )
+    await conn.commit()
+
+
+async def bench_read(conn, args: argparse.Namespace, conference_ids: List[int]) -> Dict[str, Any]:
+    loaders = {"per_subtheme": fetch_subthemes_per_row, "joined": fetch_subthemes}
+    results = {}
+    for name, loader in loaders.items():
+        latencies: List[float] = []
+        round_trips: List[int] = []
+        for i in range(args.iterations):
+            conference_id = conference_ids[i % len(conference_ids)]
+            async with conn.cursor() as raw:
+                cursor = CountingCursor(raw, args.rtt_ms / 1000)
+                started = time.perf_counter()
+                await cursor.execute(
+                    "SELECT id, name, description, original_text, improved_text FROM Conferences WHERE id = %s",
+                    (conference_id,)
+                )
+                await cursor.fetchone()
+                await loader(cursor, conference_id)
+                latencies.append(time.perf_counter() - started)
+                round_trips.append(cursor.round_trips)
+        results[name] = {
+            "round_trips": max(round_trips),
+            "latency_ms": {
+                "p50": 1000 * percentile(latencies, 0.5),
+                "p95": 1000 * percentile(latencies, 0.95)
+            }
+        }
+    return results
+
+
+def synthetic_conference(args: argparse.Namespace, user_ids: List[int]) -> SimpleNamespace:
+    return SimpleNamespace(
+        name="Совещание (бенчмарк)",
+        description="Описание",
+        categories=[1, 2],
+        original_text="Текст",
+        improved_text="Текст",
+        subthemes=[
+            SimpleNamespace(
+                id=None,
+                name=f"Подтема {s}",
+                description="Описание подтемы",
+                type_id=1,
+                user_ids=random.sample(user_ids, min(args.participants, len(user_ids)))
+            )
+            for s in range(args.subthemes)
+        ]
+    )
+
+
+async def edited(cursor, conference_id: int, data: SimpleNamespace, user_ids: List[int]) -> SimpleNamespace:
+    # The typical edit: the saved subthemes come back with their ids,
+    # one in ten is renamed or changes one participant, one is dropped
+    await cursor.execute("SELECT id FROM Subthemes WHERE conference_id = %s ORDER BY id", (conference_id,))
+    ids = [row[0] for row in await cursor.fetchall()]
+    subthemes = []
+    for i, (subtheme_id, subtheme) in enumerate(zip(ids, data.subthemes)):
+        subtheme = SimpleNamespace(**vars(subtheme))
+        subtheme.id = subtheme_id
+        if i % 10 == 0:
+            subtheme.name += " (правка)"
+            subtheme.user_ids = subtheme.user_ids[1:] + [random.choice(user_ids)]
+        subthemes.append(subtheme)
+    return SimpleNamespace(**{**vars(data), "subthemes": subthemes[1:]})
+
+
+async def bench_write(conn, args: argparse.Namespace) -> Dict[str, Any]:
+    async with conn.cursor() as cursor:
+        await cursor.execute("SELECT id FROM Users")
+        user_ids = [row[0] for row in await cursor.fetchall()]
+    writers = {
+        "per_row": (create_conference_per_row, update_conference_per_row),
+        "batched": (create_conference_rows, update_conference_rows)
+    }
+    results = {}
+    for name, (create, update) in writers.items():
+        stats: Dict[str, Dict[str, List[float]]] = {
+            op: {"latencies": [], "round_trips": []} for op in ("create", "update")
+        }
+        for _ in range(args.iterations):
+            data = synthetic_conference(args, user_ids)
+            # Every iteration runs in a transaction that is rolled back,
+            # so the seeded data stays the same between runs
+            await conn.begin()
+            try:
+                async with conn.cursor() as raw:
+                    cursor = CountingCursor(raw, args.rtt_ms / 1000)
+                    started = time.perf_counter()
+                    conference_id = await create(cursor, data)
+                    stats["create"]["latencies"].append(time.perf_counter() - started)
+                    stats["create"]["round_trips"].append(cursor.round_trips)
+
+                    changed = await edited(raw, conference_id, data, user_ids)
+                    cursor = CountingCursor(raw, args.rtt_ms / 1000)
+                    started = time.perf_counter()
+                    await update(cursor, conference_id, changed)
+                    stats["update"]["latencies"].append(time.perf_counter() - started)
+                    stats["update"]["round_trips"].append(cursor.round_trips)
+            finally:
+                await conn.rollback()
+        results[name] = {
+            op: {
+                "round_trips": max(values["round_trips"]),
+                "latency_ms": {
+                    "p50": 1000 * percentile(values["latencies"], 0.5),
+                    "p95": 1000 * percentile(values["latencies"], 0.95)
+                }
+            }
+            for op, values in stats.items()
+        }
+    return results
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    conn = await asyncmy.connect(
+        host=args.host, port=args.port, user=args.user, password=args.password, db=args.database
+    )
+    try:
+        async with conn.cursor() as cursor:
+            for statement in SCHEMA:
+                await cursor.execute(statement)
+        if args.seed:
+            await seed(conn, args)
+
+        async with conn.cursor() as cursor:
+            await cursor.execute("SELECT id FROM Conferences")
+            conference_ids = [row[0] for row in await cursor.fetchall()]
+        if not conference_ids:
+            raise SystemExit("No conferences in the database, run with --seed first")
+
+        return {
+            "conferences": len(conference_ids),
+            "rtt_ms": args.rtt_ms,
+            "read": await bench_read(conn, args, conference_ids),
+            "write": await bench_write(conn, args)
+        }
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round trips and latency of the conference DB queries")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=3306)
+    parser.add_argument('--user', default="root")
+    parser.add_argument('--password', default="")
+    parser.add_argument('--database', default="awaks_bench")
+    parser.add_argument('--seed', action='store_true', help="wipe the tables and fill them with synthetic data")
+    parser.add_argument('--conferences', type=int, default=20)
+    parser.add_argument('--subthemes', type=int, default=40)
+    parser.add_argument('--participants', type=int, default=5, help="users per subtheme")
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--rtt-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), ensure_ascii=False, indent=4))
+
+
+if __name__ == "__main__":
+    main()
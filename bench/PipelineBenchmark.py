@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+import httpx
+from common.Stats import percentile
+
+# Load test for a running server.py. Point the server at the local stand-in
+# (LLM_CLIENT=mock, see llm/MockServer.py) and disable the response caches
+# (LLM_CACHE_SIZE=0 LLM_CACHE_PATH= ASR_TRANSCRIPT_CACHE_SIZE=0 ASR_TRANSCRIPT_CACHE_DIR=)
+# so that every request runs the full pipeline, then e.g.:
+#   python -m bench.PipelineBenchmark --endpoint info --text meeting.txt --requests 200 --concurrency 20
+#   python -m bench.PipelineBenchmark --endpoint recognize --audio meeting.wav --requests 20 --concurrency 4
+
+
+async def send(client: httpx.AsyncClient, args: argparse.Namespace, payload: Any) -> None:
+    if args.endpoint == "recognize":
+        response = await client.post("/recognize", files={"audio_file": ("audio", payload)})
+    else:
+        response = await client.post(f"/{args.endpoint}", content=payload.encode('utf-8'),
+                                     headers={"Content-Type": "text/plain"})
+    response.raise_for_status()
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.endpoint == "recognize":
+        with open(args.audio, 'rb') as f:
+            payload = f.read()
+    else:
+        with open(args.text, 'r', encoding='utf-8') as f:
+            payload = f.read()
+
+    latencies: List[float] = []
+    errors: List[str] = []
+    pending = iter(range(args.requests))
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+        async def worker():
+            for _ in pending:
+                started = time.perf_counter()
+                try:
+                    await send(client, args, payload)
+                    latencies.append(time.perf_counter() - started)
+                except Exception as e:
+                    errors.append(str(e))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        metrics = (await client.get("/metrics")).json()
+
+    return {
+        "endpoint": args.endpoint,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "errors": len(errors),
+        "elapsed_seconds": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": 1000 * percentile(latencies, 0.5),
+            "p95": 1000 * percentile(latencies, 0.95),
+            "max": 1000 * max(latencies) if latencies else 0.0
+        },
+        "first_errors": errors[:5],
+        "server_metrics": metrics
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end throughput of /recognize and the LLM endpoints")
+    parser.add_argument('--url', default="http://127.0.0.1:8000")
+    parser.add_argument('--endpoint', choices=["recognize", "info", "optimize", "analyze"], default="info")
+    parser.add_argument('--audio', help="audio file for /recognize")
+    parser.add_argument('--text', help="transcript file for the LLM endpoints")
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--timeout', type=float, default=600)
+    args = parser.parse_args()
+
+    if args.endpoint == "recognize" and not args.audio:
+        parser.error("--audio is required for /recognize")
+    if args.endpoint != "recognize" and not args.text:
+        parser.error("--text is required for the LLM endpoints")
+
+    print(json.dumps(asyncio.run(run(args)), ensure_ascii=False, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+from typing import Iterable
+
+
+def percentile(values: Iterable[float], p: float) -> float:
+    # Nearest-rank percentile of the sample, 0.0 when it is empty
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))] if values else 0.0
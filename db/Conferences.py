@@ -0,0 +1,186 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+USER_COLUMNS = ("id", "name", "surname", "patronomic", "role_id", "telephone", "email")
+
+# Digest of the two transcripts, stored in Conferences.text_hash on every write
+# so that version checks never have to read the LONGTEXT columns
+TEXT_HASH_SQL = "MD5(CONCAT_WS(',', QUOTE(original_text), QUOTE(improved_text)))"
+
+
+async def fetch_subthemes(cursor, conference_id: int) -> List[Dict[str, Any]]:
+    # One round trip for the whole subtheme/participant graph, grouped here,
+    # instead of a users query per subtheme
+    await cursor.execute(
+        """SELECT s.id, s.name, s.description, s.type_id,
+                  u.id, u.name, u.surname, u.patronomic,
+                  u.role_id, u.telephone, u.email
+           FROM Subthemes s
+           LEFT JOIN UsersSubthemes su ON su.subtheme = s.id
+           LEFT JOIN Users u ON u.id = su.user
+           WHERE s.conference_id = %s
+           ORDER BY s.id, u.id""",
+        (conference_id,)
+    )
+    subthemes: Dict[int, Dict[str, Any]] = {}
+    for row in await cursor.fetchall():
+        subtheme = subthemes.get(row[0])
+        if subtheme is None:
+            subtheme = subthemes[row[0]] = {
+                "id": row[0],
+                "name": row[1],
+                "description": row[2],
+                "type_id": row[3],
+                "users": []
+            }
+        if row[4] is not None:
+            subtheme["users"].append(dict(zip(USER_COLUMNS, row[4:])))
+    return list(subthemes.values())
+
+
+async def insert_subthemes(cursor, conference_id: int, subthemes: List[Any], existing_ids: Set[int]) -> List[int]:
+    if not subthemes:
+        return []
+    await cursor.executemany(
+        """INSERT INTO Subthemes (conference_id, name, description, type_id)
+           VALUES (%s, %s, %s, %s)""",
+        [(conference_id, s.name, s.description, s.type_id) for s in subthemes]
+    )
+    # lastrowid only describes one chunk of a multi-row insert, so the new
+    # ids are read back; auto-increment keeps them in insertion order
+    await cursor.execute(
+        "SELECT id FROM Subthemes WHERE conference_id = %s ORDER BY id",
+        (conference_id,)
+    )
+    return [row[0] for row in await cursor.fetchall() if row[0] not in existing_ids]
+
+
+async def insert_links(cursor, links: Iterable[Tuple[int, int]]):
+    links = sorted(links)
+    if links:
+        await cursor.executemany(
+            "INSERT INTO UsersSubthemes (subtheme, user) VALUES (%s, %s)",
+            links
+        )
+
+
+async def ensure_text_hash(cursor):
+    # Adds the column on first start and hashes the rows written before it
+    await cursor.execute(
+        """SELECT COUNT(*) FROM information_schema.COLUMNS
+           WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'Conferences' AND COLUMN_NAME = 'text_hash'"""
+    )
+    if not (await cursor.fetchone())[0]:
+        await cursor.execute("ALTER TABLE Conferences ADD COLUMN text_hash CHAR(32)")
+    await cursor.execute(f"UPDATE Conferences SET text_hash = {TEXT_HASH_SQL} WHERE text_hash IS NULL")
+
+
+async def create_conference_rows(cursor, data: Any) -> int:
+    # The hash expression reads the text columns set earlier in the same row
+    await cursor.execute(
+        f"""INSERT INTO Conferences (name, description, original_text, improved_text, text_hash)
+            VALUES (%s, %s, %s, %s, {TEXT_HASH_SQL})""",
+        (data.name, data.description, data.original_text, data.improved_text)
+    )
+    conference_id = cursor.lastrowid
+
+    if data.categories:
+        await cursor.executemany(
+            "INSERT INTO ConferenceCategories (conference_id, category_id) VALUES (%s, %s)",
+            [(conference_id, category_id) for category_id in data.categories]
+        )
+
+    subtheme_ids = await insert_subthemes(cursor, conference_id, data.subthemes, set())
+    await insert_links(cursor, {
+        (subtheme_id, user_id)
+        for subtheme_id, subtheme in zip(subtheme_ids, data.subthemes)
+        for user_id in subtheme.user_ids
+    })
+    return conference_id
+
+
+async def update_conference_rows(cursor, conference_id: int, data: Any):
+    # MySQL assigns left to right, so the hash sees the new texts
+    await cursor.execute(
+        f"""UPDATE Conferences
+            SET name = %s, description = %s,
+                original_text = %s, improved_text = %s,
+                text_hash = {TEXT_HASH_SQL}
+            WHERE id = %s""",
+        (data.name, data.description, data.original_text, data.improved_text, conference_id)
+    )
+
+    # Current subthemes and their links in one read, so that only the rows
+    # that actually differ are written back
+    await cursor.execute(
+        """SELECT s.id, s.name, s.description, s.type_id, su.user
+           FROM Subthemes s
+           LEFT JOIN UsersSubthemes su ON su.subtheme = s.id
+           WHERE s.conference_id = %s""",
+        (conference_id,)
+    )
+    current: Dict[int, Tuple[Any, Any, Any]] = {}
+    current_links: Set[Tuple[int, int]] = set()
+    for row in await cursor.fetchall():
+        current[row[0]] = (row[1], row[2], row[3])
+        if row[4] is not None:
+            current_links.add((row[0], row[4]))
+
+    # Ids that do not belong to this conference are treated as new subthemes
+    kept = [s for s in data.subthemes if s.id in current]
+    added = [s for s in data.subthemes if s.id not in current]
+
+    changed = [s for s in kept if current[s.id] != (s.name, s.description, s.type_id)]
+    if changed:
+        await cursor.executemany(
+            """INSERT INTO Subthemes (id, conference_id, name, description, type_id)
+               VALUES (%s, %s, %s, %s, %s)
+               ON DUPLICATE KEY UPDATE
+                   name = VALUES(name), description = VALUES(description), type_id = VALUES(type_id)""",
+            [(s.id, conference_id, s.name, s.description, s.type_id) for s in changed]
+        )
+
+    added_ids = await insert_subthemes(cursor, conference_id, added, set(current))
+    wanted_links = {(s.id, user_id) for s in kept for user_id in s.user_ids}
+    wanted_links |= {(subtheme_id, user_id) for subtheme_id, s in zip(added_ids, added) for user_id in s.user_ids}
+
+    removed = set(current) - {s.id for s in kept}
+    stale_links = sorted(link for link in current_links - wanted_links if link[0] not in removed)
+    if removed:
+        placeholders = ", ".join(["%s"] * len(removed))
+        await cursor.execute(f"DELETE FROM UsersSubthemes WHERE subtheme IN ({placeholders})", sorted(removed))
+        await cursor.execute(f"DELETE FROM Subthemes WHERE id IN ({placeholders})", sorted(removed))
+    if stale_links:
+        placeholders = ", ".join(["(%s, %s)"] * len(stale_links))
+        await cursor.execute(
+            f"DELETE FROM UsersSubthemes WHERE (subtheme, user) IN ({placeholders})",
+            [value for link in stale_links for value in link]
+        )
+    await insert_links(cursor, wanted_links - current_links)
+
+
+async def fetch_conference_version(cursor, conference_id: int) -> Optional[str]:
+    # A content hash computed by MySQL from the stored text_hash, so neither
+    # transcript is read or hashed here. Link rows are folded with an XOR of
+    # their hashes plus a row count, so the result does not depend on row order
+    await cursor.execute(
+        """SELECT MD5(CONCAT_WS(',',
+                      QUOTE(c.name), QUOTE(c.description), QUOTE(c.text_hash),
+                      g.row_count, g.row_hash))
+           FROM Conferences c
+           CROSS JOIN (
+               SELECT COUNT(*) AS row_count,
+                      BIT_XOR(CONV(LEFT(MD5(CONCAT_WS(',',
+                          s.id, QUOTE(s.name), QUOTE(s.description), s.type_id,
+                          QUOTE(u.id), QUOTE(u.name), QUOTE(u.surname), QUOTE(u.patronomic),
+                          QUOTE(u.role_id), QUOTE(u.telephone), QUOTE(u.email)
+                      )), 16), 16, 10)) AS row_hash
+               FROM Subthemes s
+               LEFT JOIN UsersSubthemes su ON su.subtheme = s.id
+               LEFT JOIN Users u ON u.id = su.user
+               WHERE s.conference_id = %s
+           ) g
+           WHERE c.id = %s""",
+        (conference_id, conference_id)
+    )
+    row = await cursor.fetchone()
+    return row[0] if row else None
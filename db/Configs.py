@@ -0,0 +1,24 @@
+import os
+
+# One asyncmy pool lives for the whole app; these bound it
+POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE: int = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+# Connections older than this are reopened, staying clear of the server's wait_timeout
+POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "3600"))
+POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+POOL_WAIT_WINDOW: int = int(os.getenv("DB_POOL_WAIT_WINDOW", "200"))
+
+# Keyset pagination of the listings
+PAGE_SIZE: int = int(os.getenv("DB_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE: int = int(os.getenv("DB_MAX_PAGE_SIZE", "500"))
+
+# Read-through cache for reference tables (Roles, Users); 0 entries disables it
+REFERENCE_CACHE_SIZE: int = int(os.getenv("DB_REFERENCE_CACHE_SIZE", "256"))
+REFERENCE_CACHE_TTL_SECONDS: float = float(os.getenv("DB_REFERENCE_CACHE_TTL_SECONDS", "300"))
+
+# In-process full-text index over conference names, descriptions and texts
+SEARCH_BATCH_SIZE: int = int(os.getenv("DB_SEARCH_BATCH_SIZE", "200"))
+SEARCH_MAX_RESULTS: int = int(os.getenv("DB_SEARCH_MAX_RESULTS", "50"))
+SEARCH_SNIPPET_WORDS: int = int(os.getenv("DB_SEARCH_SNIPPET_WORDS", "30"))
+# Snippets are cut from this many leading characters of a transcript, not the whole text
+SEARCH_SNIPPET_SCAN_CHARS: int = int(os.getenv("DB_SEARCH_SNIPPET_SCAN_CHARS", "20000"))
@@ -0,0 +1,29 @@
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def encode_cursor(last_id: int) -> str:
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    if not cursor:
+        return None
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        last_id = json.loads(payload)["id"]
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(last_id, int):
+        raise ValueError("Invalid cursor")
+    return last_id
+
+
+def page(rows: List[Dict[str, Any]], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    # Handlers fetch limit + 1 rows; the extra one only says whether another page exists
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1]["id"])
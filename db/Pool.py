@@ -0,0 +1,116 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+import asyncmy
+from common.Stats import percentile
+
+
+class DbPool:
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        min_size: int,
+        max_size: int,
+        recycle_seconds: int,
+        pre_ping: bool,
+        wait_window: int
+    ):
+        self.config = config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.recycle_seconds = recycle_seconds
+        self.pre_ping = pre_ping
+        self.pool = None
+        self.start_lock = asyncio.Lock()
+
+        self.waiting = 0
+        self.acquired = 0
+        self.ping_failures = 0
+        self.rollbacks = 0
+        self.waits: deque = deque(maxlen=wait_window)
+
+    async def start(self):
+        async with self.start_lock:
+            if self.pool is not None:
+                return
+            await self.open()
+
+    async def open(self):
+        # Autocommit keeps plain reads from pinning a stale snapshot on a
+        # pooled connection; writers open their own transaction with begin()
+        self.pool = await asyncmy.create_pool(
+            host=self.config["host"],
+            user=self.config["user"],
+            password=self.config["password"],
+            db=self.config["database"],
+            port=self.config["port"],
+            minsize=self.min_size,
+            maxsize=self.max_size,
+            pool_recycle=self.recycle_seconds,
+            autocommit=True
+        )
+
+    async def close(self):
+        if self.pool is None:
+            return
+        self.pool.close()
+        await self.pool.wait_closed()
+        self.pool = None
+
+    @asynccontextmanager
+    async def connection(self):
+        # A database that was down at startup is retried on the next request
+        if self.pool is None:
+            await self.start()
+
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            conn = await self.pool.acquire()
+        finally:
+            self.waiting -= 1
+        self.waits.append(time.perf_counter() - started)
+        self.acquired += 1
+
+        try:
+            if self.pre_ping:
+                try:
+                    await conn.ping(reconnect=True)
+                except Exception:
+                    self.ping_failures += 1
+                    raise
+            yield conn
+        except BaseException:
+            self.rollbacks += 1
+            # A half-done transaction must not travel to the next request
+            try:
+                await conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            await self.pool.release(conn)
+
+    def metrics(self) -> Dict[str, Any]:
+        size = self.pool.size if self.pool is not None else 0
+        free = self.pool.freesize if self.pool is not None else 0
+        return {
+            "started": self.pool is not None,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "size": size,
+            "in_use": size - free,
+            "free": free,
+            "utilization": (size - free) / self.max_size if self.max_size else 0.0,
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "ping_failures": self.ping_failures,
+            "rollbacks": self.rollbacks,
+            "wait_ms": {
+                "p50": 1000 * percentile(self.waits, 0.5),
+                "p95": 1000 * percentile(self.waits, 0.95),
+                "max": 1000 * max(self.waits, default=0.0)
+            }
+        }
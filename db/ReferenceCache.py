@@ -0,0 +1,54 @@
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class ReferenceCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[Tuple[str, Hashable], Tuple[Any, float]]" = OrderedDict()
+        # Bumped by invalidate(); a load that started before the bump is
+        # returned to its caller but never stored
+        self.generations: Dict[str, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, namespace: str, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry_key = (namespace, key)
+        entry = self.entries.get(entry_key)
+        if entry is not None and entry[1] > time.monotonic():
+            self.entries.move_to_end(entry_key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        generation = self.generations.get(namespace, 0)
+        value = await loader()
+        if self.max_entries > 0 and self.generations.get(namespace, 0) == generation:
+            self.entries[entry_key] = (value, time.monotonic() + self.ttl_seconds)
+            self.entries.move_to_end(entry_key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return value
+
+    def invalidate(self, namespace: str):
+        # Writes go through this process only; other workers catch up within the TTL
+        self.generations[namespace] = self.generations.get(namespace, 0) + 1
+        self.invalidations += 1
+        for entry_key in [k for k in self.entries if k[0] == namespace]:
+            del self.entries[entry_key]
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
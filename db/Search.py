@@ -0,0 +1,224 @@
+import asyncio
+import heapq
+import math
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from db.Stemmer import stem
+
+WORD_RE = re.compile(r"[0-9a-zа-яё]+", re.IGNORECASE)
+
+STOPWORDS = frozenset((
+    "и", "в", "во", "не", "что", "он", "на", "я", "с", "со", "как", "а", "то", "все", "она", "так",
+    "его", "но", "да", "ты", "к", "у", "же", "вы", "за", "бы", "по", "только", "ее", "мне", "было",
+    "вот", "от", "меня", "еще", "нет", "о", "из", "ему", "когда", "даже", "ну", "ли", "если", "уже",
+    "или", "ни", "быть", "был", "него", "до", "вас", "там", "потом", "себя", "ей", "может", "они",
+    "тут", "где", "есть", "надо", "ней", "для", "мы", "тебя", "их", "чем", "была", "сам", "чтоб",
+    "без", "чего", "раз", "тоже", "себе", "под", "будет", "ж", "тогда", "кто", "этот", "того",
+    "потому", "этого", "какой", "ним", "здесь", "этом", "один", "мой", "тем", "чтобы", "нее",
+    "были", "куда", "зачем", "всех", "можно", "при", "об", "хоть", "после", "над", "больше", "тот",
+    "через", "эти", "нас", "про", "всего", "них", "какая", "много", "эту", "моя", "свою", "этой",
+    "перед", "том", "такой", "им", "более", "между", "это"
+))
+
+# A word in the name counts three times, in the description twice
+FIELD_WEIGHTS = (("name", 3), ("description", 2), ("improved_text", 1))
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def terms(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return [stem(word) for word in (m.group().lower() for m in WORD_RE.finditer(text)) if word not in STOPWORDS]
+
+
+def document_terms(fields: Dict[str, Optional[str]]) -> Counter:
+    counts: Counter = Counter()
+    for field, weight in FIELD_WEIGHTS:
+        for term in terms(fields.get(field)):
+            counts[term] += weight
+    return counts
+
+
+def make_snippet(text: str, query_terms: Set[str], words: int) -> Tuple[str, List[Tuple[int, int]]]:
+    # The window of `words` words holding the most distinct query terms;
+    # highlights are [start, end) offsets of the matches inside the snippet
+    tokens = list(WORD_RE.finditer(text))
+    if not tokens:
+        return "", []
+
+    # One pass over the matches, keeping those that fit in the snippet after
+    # its leading context; stops as soon as a window holds every query term
+    context = words // 5
+    span = max(1, words - context)
+    start = 0
+    best = 0
+    window: Deque[Tuple[int, str]] = deque()
+    found: Counter = Counter()
+    for i, m in enumerate(tokens):
+        term = stem(m.group().lower())
+        if term not in query_terms:
+            continue
+        window.append((i, term))
+        found[term] += 1
+        while window[0][0] <= i - span:
+            _, dropped = window.popleft()
+            found[dropped] -= 1
+            if not found[dropped]:
+                del found[dropped]
+        if len(found) > best:
+            best, start = len(found), window[0][0]
+            if best == len(query_terms):
+                break
+
+    if best:
+        # A little context before the first match
+        start = max(0, start - context)
+    end = min(len(tokens), start + words)
+
+    begin = tokens[start].start()
+    finish = tokens[end - 1].end()
+    prefix = "…" if begin > 0 else ""
+    suffix = "…" if finish < len(text) else ""
+    snippet = prefix + re.sub(r"\s+", " ", text[begin:finish]) + suffix
+
+    highlights = []
+    offset = len(prefix)
+    for m in WORD_RE.finditer(snippet, offset):
+        if stem(m.group().lower()) in query_terms:
+            highlights.append((m.start(), m.end()))
+    return snippet, highlights
+
+
+class SearchIndex:
+    def __init__(self):
+        # Postings are parallel arrays sorted by conference id, so that adding
+        # and removing one conference touches only its own terms
+        self.term_ids: Dict[str, int] = {}
+        self.postings: List[Tuple[array, array]] = []
+        self.doc_terms: Dict[int, array] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.total_length = 0
+        self.lock = threading.Lock()
+
+        self.ready = False
+        self.building = False
+        # Conferences written while the initial build runs; the build's own,
+        # possibly older, copy of them is skipped
+        self.fresh: Set[int] = set()
+        self.build_seconds = 0.0
+        self.queries = 0
+
+    def _remove(self, conference_id: int):
+        term_ids = self.doc_terms.pop(conference_id, None)
+        if term_ids is None:
+            return
+        for term_id in term_ids:
+            docs, tfs = self.postings[term_id]
+            i = bisect_left(docs, conference_id)
+            del docs[i]
+            del tfs[i]
+        self.total_length -= self.doc_lengths.pop(conference_id)
+
+    def add(self, conference_id: int, fields: Dict[str, Optional[str]], from_build: bool = False):
+        counts = document_terms(fields)
+        with self.lock:
+            if from_build and conference_id in self.fresh:
+                return
+            if self.building and not from_build:
+                self.fresh.add(conference_id)
+            self._remove(conference_id)
+
+            term_ids = array('i')
+            for term, tf in counts.items():
+                term_id = self.term_ids.get(term)
+                if term_id is None:
+                    term_id = self.term_ids[term] = len(self.postings)
+                    self.postings.append((array('i'), array('H')))
+                docs, tfs = self.postings[term_id]
+                i = bisect_left(docs, conference_id)
+                docs.insert(i, conference_id)
+                tfs.insert(i, min(tf, 65535))
+                term_ids.append(term_id)
+            self.doc_terms[conference_id] = term_ids
+            length = sum(counts.values())
+            self.doc_lengths[conference_id] = length
+            self.total_length += length
+
+    def search(self, query_terms: List[str], limit: int) -> Tuple[List[Tuple[int, float]], int]:
+        with self.lock:
+            self.queries += 1
+            documents = len(self.doc_lengths)
+            if not documents:
+                return [], 0
+            average_length = self.total_length / documents or 1.0
+            scores: Dict[int, float] = defaultdict(float)
+            for term in set(query_terms):
+                term_id = self.term_ids.get(term)
+                if term_id is None:
+                    continue
+                docs, tfs = self.postings[term_id]
+                if not docs:
+                    continue
+                idf = math.log(1 + (documents - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc, tf in zip(docs, tfs):
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc] / average_length)
+                    scores[doc] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+            return heapq.nlargest(limit, scores.items(), key=lambda item: item[1]), len(scores)
+
+    async def build(self, db_pool, batch_size: int, retry_seconds: float = 30.0):
+        # Pages through Conferences on the id key; texts are analysed in a
+        # thread so the event loop keeps serving requests meanwhile
+        with self.lock:
+            self.building = True
+            self.fresh.clear()
+        started = time.perf_counter()
+        last_id = 0
+        while True:
+            try:
+                async with db_pool.connection() as conn:
+                    async with conn.cursor() as cursor:
+                        await cursor.execute(
+                            """SELECT id, name, description, improved_text
+                               FROM Conferences WHERE id > %s ORDER BY id LIMIT %s""",
+                            (last_id, batch_size)
+                        )
+                        rows = await cursor.fetchall()
+            except Exception as e:
+                print(f"[ERROR] Не удалось загрузить совещания для поискового индекса: {e}")
+                await asyncio.sleep(retry_seconds)
+                continue
+            if not rows:
+                break
+            await asyncio.to_thread(self._add_rows, rows)
+            last_id = rows[-1][0]
+
+        with self.lock:
+            self.building = False
+            self.fresh.clear()
+            self.ready = True
+        self.build_seconds = time.perf_counter() - started
+        print(f"Поисковый индекс построен: {len(self.doc_lengths)} совещаний за {self.build_seconds:.1f} с")
+
+    def _add_rows(self, rows: List[Tuple[Any, ...]]):
+        for conference_id, name, description, improved_text in rows:
+            self.add(conference_id, {"name": name, "description": description, "improved_text": improved_text}, True)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            documents = len(self.doc_lengths)
+            postings = sum(len(ids) for ids in self.doc_terms.values())
+        return {
+            "ready": self.ready,
+            "documents": documents,
+            "terms": len(self.term_ids),
+            "postings": postings,
+            "build_seconds": self.build_seconds,
+            "queries": self.queries,
+            "stem_cache": stem.cache_info()._asdict()
+        }
@@ -0,0 +1,110 @@
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# Snowball stemmer for Russian (snowballstem.org/algorithms/russian/stemmer.html)
+
+VOWELS = "аеиоуыэюя"
+
+
+def _suffixes(after_a: Tuple[str, ...], plain: Tuple[str, ...]) -> Tuple[Tuple[str, bool], ...]:
+    # Longest suffix first, as Snowball's "among" picks it; the flag marks
+    # suffixes that only count after "а" or "я"
+    return tuple(sorted(
+        [(s, True) for s in after_a] + [(s, False) for s in plain],
+        key=lambda item: -len(item[0])
+    ))
+
+
+PERFECTIVE_GERUND = _suffixes(
+    ("в", "вши", "вшись"),
+    ("ив", "ивши", "ившись", "ыв", "ывши", "ывшись")
+)
+ADJECTIVE = _suffixes((), (
+    "ее", "ие", "ые", "ое", "ими", "ыми", "ей", "ий", "ый", "ой", "ем", "им", "ым", "ом",
+    "его", "ого", "ему", "ому", "их", "ых", "ую", "юю", "ая", "яя", "ою", "ею"
+))
+PARTICIPLE = _suffixes(("ем", "нн", "вш", "ющ", "щ"), ("ивш", "ывш", "ующ"))
+REFLEXIVE = _suffixes((), ("ся", "сь"))
+VERB = _suffixes(
+    ("ла", "на", "ете", "йте", "ли", "й", "л", "ем", "н", "ло", "но", "ет", "ют", "ны", "ть", "ешь", "нно"),
+    ("ила", "ыла", "ена", "ейте", "уйте", "ите", "или", "ыли", "ей", "уй", "ил", "ыл", "им", "ым", "ен",
+     "ило", "ыло", "ено", "ят", "ует", "уют", "ит", "ыт", "ены", "ить", "ыть", "ишь", "ую", "ю")
+)
+NOUN = _suffixes((), (
+    "а", "ев", "ов", "ие", "ье", "е", "иями", "ями", "ами", "еи", "ии", "и", "ией", "ей", "ой", "ий", "й",
+    "иям", "ям", "ием", "ем", "ам", "ом", "о", "у", "ах", "иях", "ях", "ы", "ь", "ию", "ью", "ю", "ия", "ья", "я"
+))
+SUPERLATIVE = _suffixes((), ("ейш", "ейше"))
+DERIVATIONAL = _suffixes((), ("ост", "ость"))
+
+
+def _strip(word: str, suffixes: Tuple[Tuple[str, bool], ...]) -> Optional[str]:
+    for suffix, after_a in suffixes:
+        if word.endswith(suffix):
+            rest = word[:-len(suffix)]
+            if after_a and not rest.endswith(("а", "я")):
+                return None
+            return rest
+    return None
+
+
+def _regions(word: str) -> Tuple[int, int]:
+    rv = r1 = r2 = len(word)
+    for i, char in enumerate(word):
+        if char in VOWELS:
+            rv = i + 1
+            break
+    for i in range(1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            r1 = i + 1
+            break
+    for i in range(r1 + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            r2 = i + 1
+            break
+    return rv, r2
+
+
+@lru_cache(maxsize=200_000)
+def stem(word: str) -> str:
+    word = word.lower().replace("ё", "е")
+    rv, r2 = _regions(word)
+    head, tail = word[:rv], word[rv:]
+
+    # Step 1: gerund, or reflexive followed by an adjectival, verb or noun ending
+    rest = _strip(tail, PERFECTIVE_GERUND)
+    if rest is None:
+        rest = _strip(tail, REFLEXIVE)
+        if rest is not None:
+            tail = rest
+        rest = _strip(tail, ADJECTIVE)
+        if rest is not None:
+            participle = _strip(rest, PARTICIPLE)
+            rest = participle if participle is not None else rest
+        else:
+            rest = _strip(tail, VERB)
+            if rest is None:
+                rest = _strip(tail, NOUN)
+    if rest is not None:
+        tail = rest
+
+    # Step 2
+    if tail.endswith("и"):
+        tail = tail[:-1]
+
+    # Step 3: derivational ending, only inside R2
+    for suffix, _ in DERIVATIONAL:
+        if tail.endswith(suffix) and rv + len(tail) - len(suffix) >= r2:
+            tail = tail[:-len(suffix)]
+            break
+
+    # Step 4
+    rest = _strip(tail, SUPERLATIVE)
+    if rest is not None:
+        tail = rest
+    if tail.endswith("нн"):
+        tail = tail[:-1]
+    elif rest is None and tail.endswith("ь"):
+        tail = tail[:-1]
+
+    return head + tail
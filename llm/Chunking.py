@@ -0,0 +1,71 @@
+import asyncio
+import re
+from typing import Awaitable, Callable, List, Tuple
+
+SENTENCE_END = re.compile(r'(?<=[.!?…])\s+|\n+')
+WORD_END = re.compile(r'\s+')
+
+
+def estimate_tokens(text: str, chars_per_token: float) -> int:
+    return int(len(text) / chars_per_token) + 1
+
+
+def split_units(text: str, pattern: re.Pattern) -> List[Tuple[str, str]]:
+    # Every unit keeps the whitespace that followed it, so joining the units
+    # back together reproduces the original text exactly
+    units = []
+    position = 0
+    for match in pattern.finditer(text):
+        units.append((text[position:match.start()], match.group(0)))
+        position = match.end()
+    if position < len(text):
+        units.append((text[position:], ""))
+    return units
+
+
+def chunk_text(text: str, max_tokens: int, chars_per_token: float) -> List[Tuple[str, str]]:
+    units = []
+    for sentence, separator in split_units(text, SENTENCE_END):
+        if estimate_tokens(sentence, chars_per_token) <= max_tokens:
+            units.append((sentence, separator))
+            continue
+        # Raw ASR output has no punctuation at all, so an oversized "sentence"
+        # falls back to word boundaries
+        words = split_units(sentence, WORD_END)
+        words[-1] = (words[-1][0], words[-1][1] + separator)
+        units.extend(words)
+
+    chunks = []
+    current, current_separator = "", ""
+    for unit, separator in units:
+        candidate = current + current_separator + unit if current else unit
+        if current and estimate_tokens(candidate, chars_per_token) > max_tokens:
+            chunks.append((current, current_separator))
+            candidate = unit
+        current, current_separator = candidate, separator
+    if current:
+        chunks.append((current, current_separator))
+    return chunks
+
+
+async def map_chunks(
+    text: str,
+    process: Callable[[str], Awaitable[str]],
+    max_tokens: int,
+    chars_per_token: float,
+    concurrency: int
+) -> str:
+    chunks = chunk_text(text, max_tokens, chars_per_token)
+    if len(chunks) <= 1:
+        return await process(text)
+
+    limiter = asyncio.Semaphore(concurrency)
+
+    async def run(chunk: str) -> str:
+        async with limiter:
+            return await process(chunk)
+
+    results = await asyncio.gather(*(run(chunk) for chunk, _ in chunks))
+    # Chunks are reassembled in their original order with the original
+    # separators between them, so paragraph breaks survive the split
+    return "".join(result.strip() + separator for result, (_, separator) in zip(results, chunks)).strip()
@@ -0,0 +1,105 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+from common.Stats import percentile
+from llm.Governor import OutboundGovernor
+
+
+class LlmClient:
+    def __init__(
+        self,
+        get_chat_model: Callable[[], Awaitable[Any]],
+        max_in_flight: int,
+        latency_window: int,
+        governor: OutboundGovernor
+    ):
+        self.get_chat_model = get_chat_model
+        self.governor = governor
+        self.max_in_flight = max_in_flight
+        self.limiter = asyncio.Semaphore(max_in_flight)
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.errors = 0
+        self.latencies: deque = deque(maxlen=latency_window)
+        self.first_token_latencies: deque = deque(maxlen=latency_window)
+
+    @asynccontextmanager
+    async def slot(self):
+        # The limiter caps concurrent upstream calls for the whole process,
+        # so a burst of requests queues here instead of stalling the server
+        self.waiting += 1
+        async with self.limiter:
+            self.waiting -= 1
+            self.in_flight += 1
+            started = time.perf_counter()
+            try:
+                yield started
+            except Exception:
+                self.errors += 1
+                raise
+            finally:
+                self.in_flight -= 1
+                self.calls += 1
+                self.latencies.append(time.perf_counter() - started)
+
+    async def invoke(self, messages: List[Any], name: str = "llm") -> str:
+        chat_model = await self.get_chat_model()
+
+        async def attempt():
+            async with self.slot():
+                return await chat_model.ainvoke(messages)
+
+        # Retries happen outside the slot, so backing off never holds a limiter place
+        started = time.perf_counter()
+        res = await self.governor.call(attempt)
+        print(f"GigaChat ({name}, {time.perf_counter() - started:.2f} с): ", res.content)
+        return res.content
+
+    async def stream(self, messages: List[Any], name: str = "llm") -> AsyncIterator[str]:
+        chat_model = await self.get_chat_model()
+
+        # A stream is never retried: tokens may already be on their way to the client
+        probe = await self.governor.before_call()
+        try:
+            async with self.slot() as started:
+                first_token = None
+                async for chunk in chat_model.astream(messages):
+                    if first_token is None:
+                        first_token = time.perf_counter() - started
+                        self.first_token_latencies.append(first_token)
+                    yield chunk.content
+        except Exception as e:
+            self.governor.after_call(e)
+            raise
+        except BaseException:
+            # The client went away mid-stream; that proves nothing about
+            # upstream, so only the probe slot is handed back
+            self.governor.abandon(probe)
+            raise
+        # Success is recorded only for a stream that ran to the end
+        self.governor.after_call()
+
+        print(f"GigaChat ({name}, поток, {time.perf_counter() - started:.2f} с)")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "governor": self.governor.metrics(),
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "calls": self.calls,
+            "errors": self.errors,
+            "latency_ms": {
+                "p50": 1000 * percentile(self.latencies, 0.5),
+                "p95": 1000 * percentile(self.latencies, 0.95),
+                "max": 1000 * max(self.latencies, default=0.0)
+            },
+            "first_token_ms": {
+                "p50": 1000 * percentile(self.first_token_latencies, 0.5),
+                "p95": 1000 * percentile(self.first_token_latencies, 0.95)
+            }
+        }
@@ -0,0 +1,28 @@
+import os
+
+MAX_IN_FLIGHT: int = int(os.getenv("LLM_MAX_IN_FLIGHT", "4"))
+LATENCY_WINDOW: int = int(os.getenv("LLM_LATENCY_WINDOW", "200"))
+
+# Rough size of a GigaChat token for Russian text, used to budget prompt chunks
+CHARS_PER_TOKEN: float = float(os.getenv("LLM_CHARS_PER_TOKEN", "3"))
+CHUNK_TOKENS: int = int(os.getenv("LLM_CHUNK_TOKENS", "1500"))
+CHUNK_CONCURRENCY: int = int(os.getenv("LLM_CHUNK_CONCURRENCY", "3"))
+
+CACHE_SIZE: int = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+# Empty string keeps the cache in memory only
+CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", os.path.join("Data", "llm_cache.sqlite3"))
+CACHE_TTL_SECONDS: float = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# "gigachat" talks to the real service, "mock" to a local llm/MockServer.py instance
+CLIENT: str = os.getenv("LLM_CLIENT", "gigachat")
+MOCK_URL: str = os.getenv("LLM_MOCK_URL", "http://127.0.0.1:8090/v1")
+
+# Outbound governor: token bucket matched to the GigaChat quota, jittered
+# exponential retries and a circuit breaker shared by every call site
+RATE_PER_SECOND: float = float(os.getenv("LLM_RATE_PER_SECOND", "5"))
+RATE_BURST: float = float(os.getenv("LLM_RATE_BURST", "10"))
+MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+RETRY_BASE_SECONDS: float = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+RETRY_MAX_SECONDS: float = float(os.getenv("LLM_RETRY_MAX_SECONDS", "8"))
+BREAKER_FAILURES: int = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS: float = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
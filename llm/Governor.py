@@ -0,0 +1,201 @@
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+import httpx
+
+T = TypeVar("T")
+
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"GigaChat is unavailable, retry in {retry_after:.0f} s")
+        self.retry_after = retry_after
+
+
+def upstream_status(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status
+    # gigachat.exceptions.ResponseError carries (url, status_code, content, headers)
+    if len(error.args) >= 2 and isinstance(error.args[1], int):
+        return error.args[1]
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (httpx.TransportError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    return upstream_status(error) in RETRYABLE_STATUSES
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        # Callers queue on the lock, so tokens are handed out in arrival order
+        async with self.lock:
+            self._refill()
+            if self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+                self.throttled += 1
+                self.throttled_seconds += wait
+                await asyncio.sleep(wait)
+                self._refill()
+            self.tokens -= 1
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+
+        self.opened = 0
+        self.rejected = 0
+
+    def check(self) -> bool:
+        # True when the caller got the half-open probe slot and has to hand it back
+        if self.state == "open":
+            remaining = self.opened_at + self.reset_seconds - time.monotonic()
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(remaining)
+            self.state = "half_open"
+        if self.state == "half_open":
+            # Only one probe goes upstream; everyone else keeps failing fast
+            if self.probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(self.reset_seconds)
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+
+    def release(self):
+        # A call that ended with a non-upstream error says nothing about
+        # upstream health, but must not keep the half-open probe slot
+        self.probe_in_flight = False
+
+
+class OutboundGovernor:
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: float,
+        max_retries: int,
+        retry_base_seconds: float,
+        retry_max_seconds: float,
+        breaker_failures: int,
+        breaker_reset_seconds: float
+    ):
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.breaker = CircuitBreaker(breaker_failures, breaker_reset_seconds)
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+
+        self.attempts = 0
+        self.retries = 0
+        self.failures = 0
+
+    async def before_call(self) -> bool:
+        probe = self.breaker.check()
+        try:
+            await self.bucket.acquire()
+        except BaseException:
+            self.abandon(probe)
+            raise
+        self.attempts += 1
+        return probe
+
+    def abandon(self, probe: bool):
+        # The call was cancelled (client gone, shutdown): nothing was learned
+        # about upstream, but a held probe slot has to be freed or the
+        # breaker stays half-open and rejects everything for good
+        if probe:
+            self.breaker.release()
+
+    def after_call(self, error: Optional[Exception] = None):
+        if error is None:
+            self.breaker.record_success()
+        elif is_retryable(error):
+            self.failures += 1
+            self.breaker.record_failure()
+        else:
+            self.breaker.release()
+
+    async def call(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        for retry in range(self.max_retries + 1):
+            probe = await self.before_call()
+            try:
+                result = await attempt()
+            except Exception as e:
+                self.after_call(e)
+                if not is_retryable(e) or retry == self.max_retries:
+                    raise
+                # Full jitter keeps retries from a burst of failed calls
+                # from hitting the upstream again in lockstep
+                self.retries += 1
+                await asyncio.sleep(random.uniform(0, min(self.retry_max_seconds, self.retry_base_seconds * 2 ** retry)))
+            except BaseException:
+                self.abandon(probe)
+                raise
+            else:
+                self.after_call()
+                return result
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "bucket": {
+                "rate_per_second": self.bucket.rate,
+                "burst": self.bucket.capacity,
+                "available": round(self.bucket.available(), 2),
+                "throttled": self.bucket.throttled,
+                "throttled_seconds": round(self.bucket.throttled_seconds, 3)
+            },
+            "breaker": {
+                "state": self.breaker.state,
+                "consecutive_failures": self.breaker.failures,
+                "opened": self.breaker.opened,
+                "rejected": self.breaker.rejected
+            },
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "failures": self.failures
+        }
@@ -0,0 +1,181 @@
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# A stand-in for the GigaChat REST API (chat/completions and models), for
+# load tests and profiling without the real service. Start it with
+#   python -m llm.MockServer --port 8090 --latency-ms 800 --tokens-per-second 40
+# and run server.py with LLM_CLIENT=mock LLM_MOCK_URL=http://127.0.0.1:8090/v1
+
+DEFAULT_RESPONSES = [
+    {
+        "match": "Исправь все ошибки",
+        "echo": True
+    },
+    {
+        "match": "JSON-объектом",
+        "content": json.dumps({
+            "questions": ["Сроки поставки оборудования", "Бюджет проекта на следующий квартал"],
+            "title": "Планирование проекта",
+            "description": "Обсуждение сроков поставки и бюджета проекта."
+        }, ensure_ascii=False)
+    },
+    {
+        "match": "Перечисли ВСЕ основные вопросы",
+        "content": "Сроки поставки оборудования\nБюджет проекта на следующий квартал"
+    },
+    {
+        "match": "Сгенерируй краткий заголовок",
+        "content": "Заголовок: Планирование проекта\nОписание: Обсуждение сроков поставки и бюджета проекта."
+    }
+]
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class MockBehaviour:
+    def __init__(self, args: argparse.Namespace):
+        self.latency_ms = args.latency_ms
+        self.latency_sigma = args.latency_sigma
+        self.tokens_per_second = args.tokens_per_second
+        self.chars_per_token = args.chars_per_token
+        self.error_rate = args.error_rate
+        self.random = random.Random(args.seed)
+        self.concurrency = asyncio.Semaphore(args.max_concurrency)
+        self.bucket = TokenBucket(args.rate_limit, args.rate_limit) if args.rate_limit > 0 else None
+        self.responses: List[Dict[str, Any]] = DEFAULT_RESPONSES
+        if args.responses:
+            with open(args.responses, 'r', encoding='utf-8') as f:
+                self.responses = json.load(f) + DEFAULT_RESPONSES
+
+    def first_token_delay(self) -> float:
+        # Log-normal with the configured median, like real upstream latency
+        return self.latency_ms / 1000 * self.random.lognormvariate(0, self.latency_sigma)
+
+    def answer(self, prompt: str) -> str:
+        for response in self.responses:
+            if response["match"] in prompt:
+                if response.get("echo"):
+                    return prompt.split("Текст:", 1)[-1].strip()
+                return response["content"]
+        return "Ответ тестового сервера."
+
+    def split_tokens(self, content: str) -> List[str]:
+        size = max(1, int(self.chars_per_token))
+        return [content[i:i + size] for i in range(0, len(content), size)]
+
+
+def create_app(behaviour: MockBehaviour) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/v1/models")
+    async def get_models():
+        return {"object": "list", "data": [{"id": "GigaChat", "object": "model", "owned_by": "mock"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        model = body.get("model") or "GigaChat"
+
+        if behaviour.bucket is not None and not behaviour.bucket.take():
+            return JSONResponse(status_code=429, content={"status": 429, "message": "Too Many Requests"})
+        if behaviour.random.random() < behaviour.error_rate:
+            return JSONResponse(status_code=500, content={"status": 500, "message": "Internal Server Error"})
+
+        content = behaviour.answer(prompt)
+        tokens = behaviour.split_tokens(content)
+        usage = {
+            "prompt_tokens": int(len(prompt) / behaviour.chars_per_token) + 1,
+            "completion_tokens": len(tokens),
+            "total_tokens": int(len(prompt) / behaviour.chars_per_token) + 1 + len(tokens)
+        }
+        token_delay = 1 / behaviour.tokens_per_second if behaviour.tokens_per_second > 0 else 0.0
+
+        if body.get("stream"):
+            async def events():
+                async with behaviour.concurrency:
+                    await asyncio.sleep(behaviour.first_token_delay())
+                    for i, token in enumerate(tokens):
+                        if i:
+                            await asyncio.sleep(token_delay)
+                        chunk = {
+                            "choices": [{"delta": {"role": "assistant", "content": token}, "index": 0}],
+                            "created": int(time.time()),
+                            "model": model,
+                            "object": "chat.completion"
+                        }
+                        yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                    final = {
+                        "choices": [{"delta": {"content": ""}, "index": 0, "finish_reason": "stop"}],
+                        "created": int(time.time()),
+                        "model": model,
+                        "object": "chat.completion",
+                        "usage": usage
+                    }
+                    yield f"data: {json.dumps(final, ensure_ascii=False)}\n\n"
+                    yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        async with behaviour.concurrency:
+            await asyncio.sleep(behaviour.first_token_delay() + token_delay * max(0, len(tokens) - 1))
+
+        return {
+            "id": uuid.uuid4().hex,
+            "choices": [{
+                "message": {"role": "assistant", "content": content},
+                "index": 0,
+                "finish_reason": "stop"
+            }],
+            "created": int(time.time()),
+            "model": model,
+            "object": "chat.completion",
+            "usage": usage
+        }
+
+    return app
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local GigaChat stand-in for benchmarks")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency-ms', type=float, default=800, help="median time to the first token")
+    parser.add_argument('--latency-sigma', type=float, default=0.3, help="log-normal spread of the latency")
+    parser.add_argument('--tokens-per-second', type=float, default=40, help="generation speed of one response")
+    parser.add_argument('--chars-per-token', type=float, default=3)
+    parser.add_argument('--max-concurrency', type=int, default=8, help="requests generated at once, the rest queue")
+    parser.add_argument('--rate-limit', type=float, default=0, help="requests per second before 429, 0 disables")
+    parser.add_argument('--error-rate', type=float, default=0, help="share of requests answered with 500")
+    parser.add_argument('--responses', help="JSON list of {match, content | echo} canned responses")
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    args = parse_args()
+    uvicorn.run(create_app(MockBehaviour(args)), host=args.host, port=args.port)
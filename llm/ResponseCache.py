@@ -0,0 +1,116 @@
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text)).strip()
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int, path: str, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.connection: Optional[sqlite3.Connection] = None
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @staticmethod
+    def make_key(template: str, version: int, text: str) -> str:
+        return hashlib.sha256(f"{template}:{version}:{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+        return self.connection
+
+    def _read_disk(self, key: str) -> Optional[Tuple[str, float]]:
+        with self.lock:
+            row = self._connect().execute(
+                "SELECT value, created FROM responses WHERE key = ? AND created > ?",
+                (key, time.time() - self.ttl_seconds)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _write_disk(self, key: str, value: str, created: float):
+        with self.lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created) VALUES (?, ?, ?)",
+                (key, value, created)
+            )
+            # Expired rows are purged now and then rather than on every write
+            if self.writes % 100 == 0:
+                connection.execute("DELETE FROM responses WHERE created <= ?", (time.time() - self.ttl_seconds,))
+            connection.commit()
+
+    def _remember(self, key: str, value: str, created: float):
+        self.entries[key] = (value, created)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self.entries.get(key)
+        if entry is not None and entry[1] > time.time() - self.ttl_seconds:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        if self.path:
+            try:
+                entry = await asyncio.to_thread(self._read_disk, key)
+            except sqlite3.Error as e:
+                print(f"[ERROR] Не удалось прочитать кэш ответов LLM: {e}")
+                entry = None
+            if entry is not None:
+                self._remember(key, *entry)
+                self.disk_hits += 1
+                return entry[0]
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, value: str):
+        created = time.time()
+        self._remember(key, value, created)
+        self.writes += 1
+        if self.path:
+            try:
+                await asyncio.to_thread(self._write_disk, key, value, created)
+            except sqlite3.Error as e:
+                print(f"[ERROR] Не удалось сохранить кэш ответов LLM: {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "disk_tier": bool(self.path),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0
+        }
@@ -1,28 +1,171 @@
 import os
-import tempfile
-from fastapi import Body, FastAPI, UploadFile, File, HTTPException, Depends
-from fastapi.responses import FileResponse, JSONResponse
-from typing import List, Optional
+import re
+import hashlib
+import asyncio
+import threading
+from fastapi import APIRouter, Body, FastAPI, UploadFile, File, HTTPException, Depends, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from typing import Any, AsyncIterator, Callable, List, Optional
 from fastapi.middleware.cors import CORSMiddleware
-from transformers import Wav2Vec2ForCTC, Wav2Vec2Processor, AutoTokenizer, AutoModelForSeq2SeqLM
-from pyaspeller import YandexSpeller
-import torch
-import torchaudio
+from contextlib import asynccontextmanager
 import json
-from pydantic import BaseModel, Field
-import asyncpg
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_gigachat.chat_models import GigaChat
-import mysql.connector
-from mysql.connector import pooling
 import asyncmy
-from asyncmy import connect, Pool
 import requests
-from doc.LoadData import load_protocol_data
 from doc.PrintProtocol import create_protocol
+from asr.Configs import (
+    CHUNK_WINDOW_SECONDS, CHUNK_OVERLAP_SECONDS, VAD_ENABLED,
+    MODEL_NAME, MODEL_BACKEND, MODEL_QUANTIZE, VAD_FRAME_MS, VAD_MARGIN_DB, VAD_MIN_SPEECH_MS,
+    VAD_MIN_SILENCE_MS, VAD_PAD_MS, TRANSCRIPT_CACHE_SIZE, TRANSCRIPT_CACHE_DIR,
+    TRANSCRIPT_CACHE_DISK_SIZE, TRANSCRIPT_CACHE_TTL_SECONDS,
+    JOB_WORKERS, JOB_QUEUE_SIZE, JOB_TTL_SECONDS
+)
+from asr.TranscriptCache import TranscriptCache
+from asr.Jobs import JobManager
+from llm.Configs import (
+    MAX_IN_FLIGHT, LATENCY_WINDOW, CHARS_PER_TOKEN, CHUNK_TOKENS, CHUNK_CONCURRENCY,
+    CACHE_SIZE, CACHE_PATH, CACHE_TTL_SECONDS, CLIENT as LLM_CLIENT, MOCK_URL as LLM_MOCK_URL,
+    RATE_PER_SECOND, RATE_BURST, MAX_RETRIES, RETRY_BASE_SECONDS, RETRY_MAX_SECONDS,
+    BREAKER_FAILURES, BREAKER_RESET_SECONDS
+)
+from llm.Client import LlmClient
+from llm.Governor import OutboundGovernor, CircuitOpenError, is_retryable, upstream_status
+from llm.Chunking import map_chunks
+from llm.ResponseCache import ResponseCache
+from db.Configs import (
+    POOL_MIN_SIZE, POOL_MAX_SIZE, POOL_RECYCLE_SECONDS, POOL_PRE_PING, POOL_WAIT_WINDOW,
+    PAGE_SIZE, MAX_PAGE_SIZE, REFERENCE_CACHE_SIZE, REFERENCE_CACHE_TTL_SECONDS,
+    SEARCH_BATCH_SIZE, SEARCH_MAX_RESULTS, SEARCH_SNIPPET_WORDS, SEARCH_SNIPPET_SCAN_CHARS
+)
+from db.Pool import DbPool
+from db.Conferences import (
+    fetch_subthemes, fetch_conference_version, create_conference_rows, update_conference_rows, ensure_text_hash
+)
+from db.Pagination import decode_cursor, page
+from db.ReferenceCache import ReferenceCache
+from db.Search import SearchIndex, make_snippet, terms as search_terms
+
+# "all" serves every route, "api" serves only the API/DB and LLM routes
+# and never imports torch or loads the ASR model
+SERVER_ROLE = os.getenv("SERVER_ROLE", "all")
+if SERVER_ROLE not in ("all", "api"):
+    raise ValueError(f"Unknown SERVER_ROLE: {SERVER_ROLE}")
+
+class LazyComponent:
+    def __init__(self, loader: Callable[[], Any]):
+        self.loader = loader
+        self.value = None
+        self.error: Optional[Exception] = None
+        self.lock = threading.Lock()
+
+    def get(self) -> Any:
+        with self.lock:
+            if self.value is None:
+                try:
+                    self.value = self.loader()
+                    self.error = None
+                except Exception as e:
+                    self.error = e
+                    raise
+            return self.value
+
+    async def aget(self) -> Any:
+        if self.value is not None:
+            return self.value
+        try:
+            return await asyncio.to_thread(self.get)
+        except Exception as e:
+            raise HTTPException(status_code=503, detail=f"Component is not available: {e}")
+
+    def status(self) -> str:
+        if self.value is not None:
+            return "ready"
+        if self.error is not None:
+            return f"failed: {self.error}"
+        return "loading"
+
+def load_gigachat():
+    from langchain_gigachat.chat_models import GigaChat
+    if LLM_CLIENT == "mock":
+        return GigaChat(
+            base_url=LLM_MOCK_URL,
+            access_token="mock",
+            verify_ssl_certs=False,
+        )
+    if LLM_CLIENT != "gigachat":
+        raise ValueError(f"Unknown LLM_CLIENT: {LLM_CLIENT}")
+    return GigaChat(
+        credentials="",
+        verify_ssl_certs=False,
+    )
+
+def load_speller():
+    from pyaspeller import YandexSpeller
+    return YandexSpeller()
+
+def load_asr():
+    from asr.Service import AsrService
+    service = AsrService()
+    service.warm_up()
+    return service
+
+components = {
+    "gigachat": LazyComponent(load_gigachat),
+    "speller": LazyComponent(load_speller)
+}
+if SERVER_ROLE == "all":
+    components["asr"] = LazyComponent(load_asr)
+
+async def warm_component(name: str, component: LazyComponent):
+    try:
+        await asyncio.to_thread(component.get)
+        print(f"Компонент {name} загружен")
+    except Exception as e:
+        print(f"[ERROR] Не удалось загрузить компонент {name}: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Heavy components load in parallel in the background, so the API/DB
+    # routes answer right away and /ready reports when the rest is warm
+    warmups = [asyncio.create_task(warm_component(name, c)) for name, c in components.items()]
+    if SERVER_ROLE == "all":
+        recognition_jobs.start()
+    try:
+        await db_pool.start()
+        async with db_pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await ensure_text_hash(cursor)
+    except Exception as e:
+        print(f"[ERROR] Не удалось открыть пул соединений с БД: {e}")
+    # The search index fills from the DB in the background; /search/ answers 503 until then
+    warmups.append(asyncio.create_task(search_index.build(db_pool, SEARCH_BATCH_SIZE)))
+    yield
+    for task in warmups:
+        task.cancel()
+    if SERVER_ROLE == "all":
+        await recognition_jobs.stop()
+    if "asr" in components and components["asr"].value is not None:
+        await components["asr"].value.stop()
+    await db_pool.close()
+
+app = FastAPI(lifespan=lifespan)
+asr_router = APIRouter()
 
-app = FastAPI()
+transcript_cache = TranscriptCache(
+    TRANSCRIPT_CACHE_SIZE, TRANSCRIPT_CACHE_DIR, TRANSCRIPT_CACHE_DISK_SIZE, TRANSCRIPT_CACHE_TTL_SECONDS
+)
+recognition_jobs = JobManager(JOB_WORKERS, JOB_QUEUE_SIZE, JOB_TTL_SECONDS)
+llm = LlmClient(
+    components["gigachat"].aget,
+    MAX_IN_FLIGHT,
+    LATENCY_WINDOW,
+    OutboundGovernor(
+        RATE_PER_SECOND, RATE_BURST, MAX_RETRIES, RETRY_BASE_SECONDS, RETRY_MAX_SECONDS,
+        BREAKER_FAILURES, BREAKER_RESET_SECONDS
+    )
+)
+llm_cache = ResponseCache(CACHE_SIZE, CACHE_PATH, CACHE_TTL_SECONDS)
 
 origins = ["*"]
 
@@ -34,32 +177,115 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
-speller = YandexSpeller()
+# Bump a template's version whenever its prompt changes, so answers cached
+# for the old prompt are never served for the new one
+PROMPT_VERSIONS = {
+    "make_text_better": 2,
+    "category_text": 1,
+    "get_text_info": 1,
+    "analyze_text": 1
+}
 
-MODEL_NAME = "bond005/wav2vec2-large-ru-golos"
-processor = Wav2Vec2Processor.from_pretrained(MODEL_NAME)
-model = Wav2Vec2ForCTC.from_pretrained(MODEL_NAME)
+async def invoke_cached(template: str, text: str, messages, validate: Optional[Callable[[str], Any]] = None) -> str:
+    key = ResponseCache.make_key(template, PROMPT_VERSIONS[template], text)
+    cached = await llm_cache.get(key)
+    if cached is not None:
+        return cached
 
-giga = GigaChat(
-    credentials="",
-    verify_ssl_certs=False,
-)
+    result = await llm.invoke(messages, template)
+    # Answers that fail validation raise here and are never cached
+    if validate is not None:
+        validate(result)
+    await llm_cache.put(key, result)
+    return result
+
+async def stream_cached(template: str, text: str, messages, validate: Optional[Callable[[str], Any]] = None) -> AsyncIterator[str]:
+    key = ResponseCache.make_key(template, PROMPT_VERSIONS[template], text)
+    cached = await llm_cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    async for part in llm.stream(messages, template):
+        parts.append(part)
+        yield part
+    # The assembled answer lands in the same cache entry the non-streaming
+    # endpoint reads, so both variants return the same text
+    result = "".join(parts)
+    if validate is not None:
+        validate(result)
+    await llm_cache.put(key, result)
 
-def make_text_better(text: str):
+def llm_http_error(e: Exception) -> HTTPException:
+    # Throttling and outages become retryable statuses with Retry-After
+    # instead of a bare 500 that clients retry immediately
+    if isinstance(e, CircuitOpenError):
+        return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after) + 1)})
+    if upstream_status(e) == 429:
+        return HTTPException(
+            status_code=429,
+            detail="GigaChat rate limit exceeded",
+            headers={"Retry-After": str(int(RETRY_MAX_SECONDS))}
+        )
+    if is_retryable(e):
+        return HTTPException(status_code=502, detail=f"GigaChat is unavailable: {e}")
+    return HTTPException(status_code=500, detail=str(e))
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def stream_llm_response(
+    template: str,
+    text: str,
+    messages,
+    finish: Optional[Callable[[str], dict]] = None
+) -> StreamingResponse:
+    # finish turns the assembled answer into the fields of the "done" event;
+    # if it rejects the answer, the answer is not cached and the stream ends in a 502
+    async def events():
+        parts = []
+        try:
+            async for part in stream_cached(template, text, messages, finish):
+                parts.append(part)
+                yield sse_event("token", {"text": part})
+            result = {"status": "success", "text": "".join(parts)}
+            if finish is not None:
+                result.update(finish(result["text"]))
+        except ValueError as e:
+            yield sse_event("error", {"status": "error", "code": 502, "detail": f"Invalid GigaChat response: {e}"})
+            return
+        except Exception as e:
+            error = llm_http_error(e)
+            yield sse_event("error", {
+                "status": "error",
+                "code": error.status_code,
+                "detail": error.detail,
+                "retry_after": (error.headers or {}).get("Retry-After")
+            })
+            return
+        yield sse_event("done", result)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+async def correct_fragment(text: str):
     messages = [
         HumanMessage(content=f"""\
         Исправь все ошибки в тексте и улучши пунктуацию. НЕ МЕНЯЙ СТРУКТУРУ ТЕКСТА.
+        Если текст обрывается на полуслове, не дописывай его и не добавляй вступлений.
         Текст:
         {text}
         """)
     ]
-    res = giga.invoke(messages)
-    messages.append(res)
-    print("GigaChat: ", res.content)
-    return res.content
+    return await invoke_cached("make_text_better", text, messages)
 
-def category_text(text: str):
-    messages = [
+async def make_text_better(text: str):
+    # Long transcripts are corrected fragment by fragment so that every
+    # prompt fits the context window; fragments run in parallel
+    return await map_chunks(text, correct_fragment, CHUNK_TOKENS, CHARS_PER_TOKEN, CHUNK_CONCURRENCY)
+
+def category_messages(text: str):
+    return [
         HumanMessage(content=f"""\
         Перечисли ВСЕ основные вопросы совещания, указанные в тексте, строго в следующем формате, без лишней нумерации:
         [список основных вопросов].
@@ -67,13 +293,12 @@ def category_text(text: str):
         {text}
         """)
     ]
-    res = giga.invoke(messages)
-    messages.append(res)
-    print("GigaChat: ", res.content)
-    return res.content
 
-def get_text_info(text: str):
-    messages = [
+async def category_text(text: str):
+    return await invoke_cached("category_text", text, category_messages(text))
+
+def text_info_messages(text: str):
+    return [
         HumanMessage(content=f"""\
         Сгенерируй краткий заголовок (3-5 слов) и описание (1 предложение) для текста совещания. 
         Формат вывода строго:
@@ -89,68 +314,274 @@ def get_text_info(text: str):
         {text}
         """)
     ]
-    res = giga.invoke(messages)
-    messages.append(res)
-    print("GigaChat: ", res.content)
-    return res.content
 
-@app.post("/recognize")
+async def get_text_info(text: str):
+    return await invoke_cached("get_text_info", text, text_info_messages(text))
+
+class MeetingAnalysis(BaseModel):
+    # Strict: a string where a list belongs, or a null, is a bad answer,
+    # not something to coerce
+    model_config = ConfigDict(strict=True)
+
+    questions: List[str]
+    title: str
+    description: str
+
+    @field_validator("questions")
+    @classmethod
+    def drop_blank_questions(cls, questions: List[str]) -> List[str]:
+        return [question.strip() for question in questions if question.strip()]
+
+def parse_meeting_analysis(content: str) -> MeetingAnalysis:
+    match = re.search(r'\{.*\}', content, re.DOTALL)
+    if not match:
+        raise ValueError("GigaChat response contains no JSON object")
+    # ValidationError is a ValueError, so a malformed answer becomes a 502 and is never cached
+    return MeetingAnalysis.model_validate(json.loads(match.group(0)))
+
+def analyze_messages(text: str):
+    return [
+        HumanMessage(content=f"""\
+        Проанализируй текст совещания и верни результат строго одним JSON-объектом, без пояснений и разметки:
+        {{"questions": ["вопрос", "вопрос"], "title": "заголовок", "description": "описание"}}
+        Требования:
+        1. questions - ВСЕ основные вопросы совещания, указанные в тексте, без нумерации
+        2. title - краткий заголовок (3-5 слов)
+        3. description - описание (1 предложение)
+        4. Только факты из текста, без интерпретаций, используй ключевые темы обсуждения
+        5. Без дополнительных символов (*, - и т.д.) внутри значений
+        6. Не включай оригинальный текст в ответ
+        7. Язык сохраняй как в оригинале
+        Сам текст:
+        {text}
+        """)
+    ]
+
+async def analyze_meeting(text: str) -> MeetingAnalysis:
+    return parse_meeting_analysis(await invoke_cached("analyze_text", text, analyze_messages(text), parse_meeting_analysis))
+
+class RecognitionParams(BaseModel):
+    sampling_rate: int
+    chunk_length_s: float
+    chunk_overlap_s: float
+    vad: bool
+
+async def read_recognition_upload(audio_file: UploadFile, params: RecognitionParams) -> bytes:
+    if params.chunk_length_s <= 0 or params.chunk_overlap_s < 0 or params.chunk_overlap_s >= params.chunk_length_s:
+        raise HTTPException(status_code=400, detail="Invalid chunk window or overlap")
+
+    content = await audio_file.read()
+    from asr.Decoding import detect_format
+    if detect_format(content[:12]) is None:
+        raise HTTPException(status_code=400, detail="Unsupported file format")
+    return content
+
+def recognition_cache_key(content: bytes, params: RecognitionParams) -> str:
+    # Everything that changes the result is part of the key, so switching the
+    # model, backend, chunking or the correction prompt never serves a stale one
+    return TranscriptCache.make_key(content, {
+        "prompt_version": PROMPT_VERSIONS["make_text_better"],
+        "model": MODEL_NAME,
+        "backend": MODEL_BACKEND,
+        "quantize": MODEL_QUANTIZE,
+        "sampling_rate": params.sampling_rate,
+        "chunk_length_s": params.chunk_length_s,
+        "chunk_overlap_s": params.chunk_overlap_s,
+        "vad": [VAD_FRAME_MS, VAD_MARGIN_DB, VAD_MIN_SPEECH_MS, VAD_MIN_SILENCE_MS, VAD_PAD_MS] if params.vad else None
+    })
+
+async def run_recognition(
+    content: bytes,
+    cache_key: str,
+    params: RecognitionParams,
+    progress: Optional[Callable[[str, float], None]] = None
+) -> dict:
+    report = progress or (lambda stage, fraction: None)
+    service = await components["asr"].aget()
+
+    # Transcription takes the first 90% of the progress scale, correction the rest
+    result = await service.transcribe(
+        content, params.sampling_rate, params.chunk_length_s, params.chunk_overlap_s, params.vad,
+        lambda stage, fraction: report(stage, 0.9 * fraction)
+    )
+    transcription = result["raw_text"]
+    report("correcting", 0.9)
+    corrected = await make_text_better(transcription) if transcription else ""
+
+    result = {
+        "text": corrected,
+        "raw_text": transcription,
+        "segments": result["segments"],
+        "duration_seconds": result["duration_seconds"],
+        "skipped_seconds": result["skipped_seconds"],
+        "skipped_ratio": result["skipped_ratio"]
+    }
+    await asyncio.to_thread(transcript_cache.put, cache_key, result)
+    return result
+
+@asr_router.post("/recognize")
 async def recognize_speech(
     audio_file: UploadFile = File(...),
     language: Optional[str] = "ru",
-    sampling_rate: Optional[int] = 16000
+    sampling_rate: Optional[int] = 16000,
+    chunk_length_s: Optional[float] = CHUNK_WINDOW_SECONDS,
+    chunk_overlap_s: Optional[float] = CHUNK_OVERLAP_SECONDS,
+    vad: Optional[bool] = VAD_ENABLED
 ):
-    if not audio_file.filename.lower().endswith(('.wav', '.mp3', '.ogg', '.flac')):
-        raise HTTPException(status_code=400, detail="Unsupported file format")
+    params = RecognitionParams(
+        sampling_rate=sampling_rate, chunk_length_s=chunk_length_s, chunk_overlap_s=chunk_overlap_s, vad=vad
+    )
+    content = await read_recognition_upload(audio_file, params)
+
+    cache_key = await asyncio.to_thread(recognition_cache_key, content, params)
+    cached = await asyncio.to_thread(transcript_cache.get, cache_key)
+    if cached is not None:
+        return JSONResponse(content={"status": "success", **cached, "language": language, "cached": True})
 
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio:
-            content = await audio_file.read()
-            temp_audio.write(content)
-            temp_audio_path = temp_audio.name
+        result = await run_recognition(content, cache_key, params)
+        return JSONResponse(content={"status": "success", **result, "language": language, "cached": False})
 
-        waveform, sr = torchaudio.load(temp_audio_path)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise llm_http_error(e)
 
-        if sr != sampling_rate:
-            resampler = torchaudio.transforms.Resample(orig_freq=sr, new_freq=sampling_rate)
-            waveform = resampler(waveform)
+@asr_router.post("/recognize/jobs", status_code=202)
+async def create_recognition_job(
+    audio_file: UploadFile = File(...),
+    language: Optional[str] = "ru",
+    sampling_rate: Optional[int] = 16000,
+    chunk_length_s: Optional[float] = CHUNK_WINDOW_SECONDS,
+    chunk_overlap_s: Optional[float] = CHUNK_OVERLAP_SECONDS,
+    vad: Optional[bool] = VAD_ENABLED
+):
+    params = RecognitionParams(
+        sampling_rate=sampling_rate, chunk_length_s=chunk_length_s, chunk_overlap_s=chunk_overlap_s, vad=vad
+    )
+    content = await read_recognition_upload(audio_file, params)
 
-        if waveform.shape[0] > 1:
-            waveform = torch.mean(waveform, dim=0, keepdim=True)
+    cache_key = await asyncio.to_thread(recognition_cache_key, content, params)
+    cached = await asyncio.to_thread(transcript_cache.get, cache_key)
+    if cached is not None:
+        job = recognition_jobs.finished({**cached, "language": language, "cached": True})
+    else:
+        async def runner(job):
+            result = await run_recognition(content, cache_key, params, job.report)
+            return {**result, "language": language, "cached": False}
 
-        input_values = processor(
-            waveform.squeeze().numpy(),
-            return_tensors="pt",
-            sampling_rate=sampling_rate
-        ).input_values
+        try:
+            job = recognition_jobs.submit(runner)
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=429, detail="Too many recognition jobs in the queue")
 
-        with torch.no_grad():
-            logits = model(input_values).logits
+    return {"status": "accepted", "job_id": job.id}
 
-        predicted_ids = torch.argmax(logits, dim=-1)
-        transcription = processor.batch_decode(predicted_ids)[0]
+def get_recognition_job_or_404(job_id: str):
+    job = recognition_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
 
-        corrected = make_text_better(transcription)
+@asr_router.get("/recognize/jobs/{job_id}")
+async def get_recognition_job(job_id: str):
+    return get_recognition_job_or_404(job_id).snapshot()
 
-        os.unlink(temp_audio_path)
-        return JSONResponse(content={
-            "status": "success",
+@asr_router.get("/recognize/jobs/{job_id}/events")
+async def stream_recognition_job(job_id: str):
+    job = get_recognition_job_or_404(job_id)
+
+    async def events():
+        async for snapshot in recognition_jobs.watch(job):
+            event = "progress" if snapshot["status"] in ("queued", "running") else snapshot["status"]
+            yield f"event: {event}\ndata: {json.dumps(snapshot, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@asr_router.websocket("/ws/recognize")
+async def recognize_speech_stream(
+    websocket: WebSocket,
+    sampling_rate: int = 16000,
+    encoding: str = "pcm_s16le",
+    language: str = "ru",
+    chunk_length_s: float = CHUNK_WINDOW_SECONDS,
+    chunk_overlap_s: float = CHUNK_OVERLAP_SECONDS
+):
+    await websocket.accept()
+    try:
+        service = await components["asr"].aget()
+        transcriber = service.open_stream(sampling_rate, chunk_length_s, chunk_overlap_s)
+    except (HTTPException, ValueError) as e:
+        await websocket.close(code=1011 if isinstance(e, HTTPException) else 1003, reason=str(e))
+        return
+
+    from asr.Streaming import decode_frame
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                if await transcriber.push(decode_frame(message["bytes"], encoding)):
+                    # A partial carries only the words committed since the previous one
+                    await websocket.send_json({
+                        "type": "partial",
+                        "segment": await service.decode_stream_segment(transcriber),
+                        "seconds": transcriber.committed_seconds
+                    })
+            elif message.get("text") == "end":
+                break
+
+        await transcriber.finish()
+        transcription = await service.decode_stream(transcriber)
+        corrected = await make_text_better(transcription)
+
+        await websocket.send_json({
+            "type": "final",
             "text": corrected,
             "raw_text": transcription,
+            "seconds": transcriber.committed_seconds,
             "language": language
         })
+        await websocket.close()
 
+    except WebSocketDisconnect:
+        return
     except Exception as e:
-        if 'temp_audio_path' in locals() and os.path.exists(temp_audio_path):
-            os.unlink(temp_audio_path)
-        raise HTTPException(status_code=500, detail=str(e))
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=1011)
+
+@app.get("/ready")
+async def get_readiness():
+    statuses = {name: component.status() for name, component in components.items()}
+    ready = all(status == "ready" for status in statuses.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "role": SERVER_ROLE, "components": statuses}
+    )
+
+@app.get("/metrics")
+async def get_metrics():
+    metrics = {
+        "llm": llm.metrics(),
+        "llm_cache": llm_cache.metrics(),
+        "transcript_cache": transcript_cache.metrics(),
+        "db_pool": db_pool.metrics(),
+        "reference_cache": reference_cache.metrics(),
+        "search_index": search_index.metrics()
+    }
+    if SERVER_ROLE == "all":
+        metrics["recognition_jobs"] = recognition_jobs.metrics()
+    if "asr" in components and components["asr"].value is not None:
+        metrics["asr"] = components["asr"].value.metrics()
+    return metrics
 
 @app.post("/optimize")
 async def optimize_text(
     new_text: str = Body(..., media_type="text/plain")
 ):
     try:
-        corrected = category_text(new_text)
+        corrected = await category_text(new_text)
 
         return JSONResponse(content={
             "status": "success",
@@ -158,14 +589,48 @@ async def optimize_text(
         })
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise llm_http_error(e)
+
+@app.post("/optimize/stream")
+async def optimize_text_stream(
+    new_text: str = Body(..., media_type="text/plain")
+):
+    return stream_llm_response("category_text", new_text, category_messages(new_text))
+
+@app.post("/analyze")
+async def analyze_text(
+    new_text: str = Body(..., media_type="text/plain")
+):
+    try:
+        analysis = await analyze_meeting(new_text)
+
+        return JSONResponse(content={
+            "status": "success",
+            "questions": analysis.questions,
+            "title": analysis.title,
+            "description": analysis.description
+        })
+
+    except ValueError as e:
+        raise HTTPException(status_code=502, detail=f"Invalid GigaChat response: {e}")
+    except Exception as e:
+        raise llm_http_error(e)
+
+@app.post("/analyze/stream")
+async def analyze_text_stream(
+    new_text: str = Body(..., media_type="text/plain")
+):
+    return stream_llm_response(
+        "analyze_text", new_text, analyze_messages(new_text),
+        lambda content: parse_meeting_analysis(content).model_dump()
+    )
 
 @app.post("/info")
 async def get_info(
     new_text: str = Body(..., media_type="text/plain")
 ):
     try:
-        corrected = get_text_info(new_text)
+        corrected = await get_text_info(new_text)
 
         return JSONResponse(content={
             "status": "success",
@@ -173,8 +638,14 @@ async def get_info(
         })
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    
+        raise llm_http_error(e)
+
+@app.post("/info/stream")
+async def get_info_stream(
+    new_text: str = Body(..., media_type="text/plain")
+):
+    return stream_llm_response("get_text_info", new_text, text_info_messages(new_text))
+
 class UserCreate(BaseModel):
     name: str
     surname: str
@@ -194,6 +665,8 @@ class UserResponse(BaseModel):
     email: str
     
 class SubthemeCreate(BaseModel):
+    # Set on updates to keep an existing subtheme instead of recreating it
+    id: Optional[int] = None
     name: str
     description: Optional[str] = None
     type_id: int = 1
@@ -237,252 +710,281 @@ MYSQL_CONFIG = {
     "port": 3306
 }
 
-async def get_db_pool():
-    return await asyncmy.create_pool(
-        host=MYSQL_CONFIG['host'],
-        user=MYSQL_CONFIG['user'],
-        password=MYSQL_CONFIG['password'],
-        db=MYSQL_CONFIG['database'],
-        port=MYSQL_CONFIG['port']
-    )
+db_pool = DbPool(
+    MYSQL_CONFIG, POOL_MIN_SIZE, POOL_MAX_SIZE, POOL_RECYCLE_SECONDS, POOL_PRE_PING, POOL_WAIT_WINDOW
+)
+
+reference_cache = ReferenceCache(REFERENCE_CACHE_SIZE, REFERENCE_CACHE_TTL_SECONDS)
+search_index = SearchIndex()
+
+async def index_conference(conference_id: int, conference_data: ConferenceCreate):
+    # The row is already committed; a failure here only leaves the index
+    # behind until the next restart and must not fail the write
+    try:
+        await asyncio.to_thread(search_index.add, conference_id, {
+            "name": conference_data.name,
+            "description": conference_data.description,
+            "improved_text": conference_data.improved_text
+        })
+    except Exception as e:
+        print(f"[ERROR] Не удалось обновить поисковый индекс для совещания {conference_id}: {e}")
+
+async def get_db():
+    async with db_pool.connection() as conn:
+        yield conn
+
+CONFERENCE_COLUMNS = ("name", "description", "original_text", "improved_text")
+CONFERENCE_FIELDS = CONFERENCE_COLUMNS + ("subthemes",)
+
+def parse_conference_fields(fields: Optional[str]) -> set:
+    # No fields= means the full conference, as before
+    if not fields:
+        return set(CONFERENCE_FIELDS)
+    selected = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = selected - set(CONFERENCE_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return selected
+
+def parse_cursor(cursor: Optional[str]) -> Optional[int]:
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def make_etag(*parts: Any) -> str:
+    return '"' + hashlib.sha1(json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')).hexdigest() + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+def conditional_json(request: Request, payload: Any, etag: Optional[str] = None) -> Response:
+    # Without a precomputed version the page itself is hashed: the DB work is
+    # already done, but an unchanged page is not sent again
+    etag = etag or make_etag(payload)
+    # no-cache makes the browser revalidate every time instead of trusting a stale copy
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(payload, headers=headers)
 
 @app.post("/conferences/")
-async def create_conference(conference_data: ConferenceCreate):
+async def create_conference(conference_data: ConferenceCreate, conn=Depends(get_db)):
     try:
-        async with await get_db_pool() as pool:
-            async with pool.acquire() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.execute(
-                        """INSERT INTO Conferences (name, description, original_text, improved_text)
-                        VALUES (%s, %s, %s, %s)""",
-                        (conference_data.name, conference_data.description, 
-                         conference_data.original_text, conference_data.improved_text)
-                    )
-                    conference_id = cursor.lastrowid
-                    
-                    for category_id in conference_data.categories:
-                        await cursor.execute(
-                            """INSERT INTO ConferenceCategories (conference_id, category_id)
-                            VALUES (%s, %s)""",
-                            (conference_id, category_id)
-                        )
-                    
-                    for subtheme in conference_data.subthemes:
-                        await cursor.execute(
-                            """INSERT INTO Subthemes (conference_id, name, description, type_id)
-                            VALUES (%s, %s, %s, %s)""",
-                            (conference_id, subtheme.name, subtheme.description, subtheme.type_id)
-                        )
-                        subtheme_id = cursor.lastrowid
-                        
-                        for user_id in subtheme.user_ids:
-                            await cursor.execute(
-                                """INSERT INTO UsersSubthemes (subtheme, user)
-                                VALUES (%s, %s)""",
-                                (subtheme_id, user_id)
-                            )
-                    
-                    await conn.commit()
-                    return {"status": "success", "conference_id": conference_id}
-                    
+        await conn.begin()
+        async with conn.cursor() as cursor:
+            conference_id = await create_conference_rows(cursor, conference_data)
+            await conn.commit()
+            await index_conference(conference_id, conference_data)
+            return {"status": "success", "conference_id": conference_id}
+            
     except asyncmy.Error as e:
         raise HTTPException(status_code=500, detail=f"MySQL error: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/conferences/{conference_id}")
-async def get_conference(conference_id: int):
+async def get_conference(request: Request, conference_id: int, fields: Optional[str] = None, conn=Depends(get_db)):
+    selected = parse_conference_fields(fields)
     try:
-        async with await get_db_pool() as pool:
-            async with pool.acquire() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.execute(
-                        """SELECT id, name, description, original_text, improved_text 
-                           FROM Conferences WHERE id = %s""",
-                        (conference_id,)
-                    )
-                    conference = await cursor.fetchone()
-                    
-                    if not conference:
-                        raise HTTPException(status_code=404, detail="Conference not found")
-                    
-                    await cursor.execute(
-                        """SELECT id, name, description, type_id 
-                           FROM Subthemes WHERE conference_id = %s""",
-                        (conference_id,)
-                    )
-                    subthemes = []
-                    columns = [col[0] for col in cursor.description]
-                    
-                    for row in await cursor.fetchall():
-                        subtheme = dict(zip(columns, row))
-                        subtheme_id = subtheme['id']
-                        
-                        await cursor.execute(
-                            """SELECT u.id, u.name, u.surname, u.patronomic, 
-                                      u.role_id, u.telephone, u.email
-                               FROM Users u
-                               JOIN UsersSubthemes su ON u.id = su.user
-                               WHERE su.subtheme = %s""",
-                            (subtheme_id,)
-                        )
-                        user_columns = [col[0] for col in cursor.description]
-                        users = [dict(zip(user_columns, row)) for row in await cursor.fetchall()]
-                        
-                        subtheme['users'] = users
-                        subthemes.append(subtheme)
-                    
-                    return {
-                        "conference": {
-                            "id": conference[0],
-                            "name": conference[1],
-                            "description": conference[2],
-                            "original_text": conference[3],
-                            "improved_text": conference[4]
-                        },
-                        "subthemes": subthemes
-                    }
+        async with conn.cursor() as cursor:
+            # The version lookup is all an unchanged conference costs
+            version = await fetch_conference_version(cursor, conference_id)
+            if version is None:
+                raise HTTPException(status_code=404, detail="Conference not found")
+            
+            etag = make_etag(version, sorted(selected))
+            if etag_matches(request, etag):
+                return conditional_json(request, None, etag)
+            
+            columns = ["id"] + [field for field in CONFERENCE_COLUMNS if field in selected]
+            await cursor.execute(
+                f"SELECT {', '.join(columns)} FROM Conferences WHERE id = %s",
+                (conference_id,)
+            )
+            conference = await cursor.fetchone()
+            
+            if not conference:
+                raise HTTPException(status_code=404, detail="Conference not found")
+            
+            result = {"conference": dict(zip(columns, conference))}
+            if "subthemes" in selected:
+                result["subthemes"] = await fetch_subthemes(cursor, conference_id)
+            return conditional_json(request, result, etag)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/conferences/{conference_id}")
-async def update_conference(conference_id: int, conference_data: ConferenceCreate):
+async def update_conference(conference_id: int, conference_data: ConferenceCreate, conn=Depends(get_db)):
     try:
-        async with await get_db_pool() as pool:
-            async with pool.acquire() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.execute(
-                        """UPDATE Conferences 
-                        SET name = %s, description = %s,
-                            original_text = %s, improved_text = %s
-                        WHERE id = %s""",
-                        (conference_data.name, conference_data.description,
-                         conference_data.original_text, conference_data.improved_text,
-                         conference_id)
-                    )
-                    
-                    await cursor.execute(
-                        "SELECT id FROM Subthemes WHERE conference_id = %s",
-                        (conference_id,)
-                    )
-                    old_subtheme_ids = [row[0] for row in await cursor.fetchall()]
-                    new_subtheme_ids = []
-                    
-                    for subtheme in conference_data.subthemes:
-                        if hasattr(subtheme, 'id') and subtheme.id:
-                            await cursor.execute(
-                                """UPDATE Subthemes 
-                                SET name = %s, description = %s, type_id = %s
-                                WHERE id = %s""",
-                                (subtheme.name, subtheme.description, subtheme.type_id, subtheme.id)
-                            )
-                            subtheme_id = subtheme.id
-                        else:
-                            await cursor.execute(
-                                """INSERT INTO Subthemes 
-                                (conference_id, name, description, type_id)
-                                VALUES (%s, %s, %s, %s)""",
-                                (conference_id, subtheme.name, subtheme.description, subtheme.type_id)
-                            )
-                            subtheme_id = cursor.lastrowid
-                        
-                        new_subtheme_ids.append(subtheme_id)
-                        
-                        await cursor.execute(
-                            "DELETE FROM UsersSubthemes WHERE subtheme = %s",
-                            (subtheme_id,)
-                        )
-                        
-                        for user_id in subtheme.user_ids:
-                            await cursor.execute(
-                                """INSERT INTO UsersSubthemes (subtheme, user)
-                                VALUES (%s, %s)""",
-                                (subtheme_id, user_id)
-                            )
-                    
-                    for old_id in old_subtheme_ids:
-                        if old_id not in new_subtheme_ids:
-                            await cursor.execute(
-                                "DELETE FROM Subthemes WHERE id = %s",
-                                (old_id,)
-                            )
-                    
-                    await conn.commit()
-                    return {"status": "success", "conference_id": conference_id}
-                    
+        await conn.begin()
+        async with conn.cursor() as cursor:
+            await update_conference_rows(cursor, conference_id, conference_data)
+            await conn.commit()
+            await index_conference(conference_id, conference_data)
+            return {"status": "success", "conference_id": conference_id}
+            
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 @app.get("/conferences/")
-async def get_conferences_list():
+async def get_conferences_list(
+    request: Request,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    conn=Depends(get_db)
+):
+    after_id = parse_cursor(cursor)
     try:
-        async with await get_db_pool() as pool:
-            async with pool.acquire() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.execute(
-                        """SELECT id, name, description 
-                           FROM Conferences 
-                           ORDER BY id DESC"""
-                    )
-                    
-                    columns = [col[0] for col in cursor.description]
-                    conferences = [
-                        dict(zip(columns, row))
-                        for row in await cursor.fetchall()
-                    ]
-                    
-                    return {"conferences": conferences}
-                    
+        async with conn.cursor() as db_cursor:
+            # Newest first; the cursor is the smallest id already shown
+            await db_cursor.execute(
+                """SELECT id, name, description 
+                   FROM Conferences 
+                   WHERE %s IS NULL OR id < %s
+                   ORDER BY id DESC
+                   LIMIT %s""",
+                (after_id, after_id, limit + 1)
+            )
+            
+            columns = [col[0] for col in db_cursor.description]
+            conferences, next_cursor = page(
+                [dict(zip(columns, row)) for row in await db_cursor.fetchall()],
+                limit
+            )
+            
+            return conditional_json(request, {"conferences": conferences, "next_cursor": next_cursor})
+            
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/search/")
+async def search_conferences(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(10, ge=1, le=SEARCH_MAX_RESULTS)
+):
+    if not search_index.ready:
+        raise HTTPException(status_code=503, detail="Search index is still building", headers={"Retry-After": "5"})
+    query_terms = search_terms(q)
+    if not query_terms:
+        return {"results": [], "total": 0}
+    
+    hits, total = await asyncio.to_thread(search_index.search, query_terms, limit)
+    if not hits:
+        return {"results": [], "total": total}
+    
+    try:
+        # Only a bounded prefix of each top hit's text is read back to cut the snippet
+        async with db_pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                placeholders = ", ".join(["%s"] * len(hits))
+                await cursor.execute(
+                    f"""SELECT id, name, description, SUBSTRING(improved_text, 1, %s)
+                        FROM Conferences WHERE id IN ({placeholders})""",
+                    [SEARCH_SNIPPET_SCAN_CHARS] + [conference_id for conference_id, _ in hits]
+                )
+                rows = {row[0]: row for row in await cursor.fetchall()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    def build_results():
+        wanted = set(query_terms)
+        results = []
+        for conference_id, score in hits:
+            row = rows.get(conference_id)
+            if row is None:
+                continue
+            # The snippet comes from the first field that mentions the query;
+            # when none does, the transcript opening is shown rather than the name
+            snippet, highlights = "", []
+            for text in (row[3], row[2], row[1]):
+                if text:
+                    snippet, highlights = make_snippet(text, wanted, SEARCH_SNIPPET_WORDS)
+                    if highlights:
+                        break
+            if not highlights and row[3]:
+                snippet = make_snippet(row[3], set(), SEARCH_SNIPPET_WORDS)[0]
+            results.append({
+                "id": conference_id,
+                "name": row[1],
+                "description": row[2],
+                "score": round(score, 4),
+                "snippet": snippet,
+                "highlights": highlights
+            })
+        return results
+    
+    return {"results": await asyncio.to_thread(build_results), "total": total}
+
 @app.get("/roles/")
-async def get_roles():
+async def get_roles(request: Request):
+    async def load():
+        async with db_pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute("SELECT id, name FROM Roles")
+                columns = [col[0] for col in cursor.description]
+                return {"roles": [dict(zip(columns, row)) for row in await cursor.fetchall()]}
+
     try:
-        async with await get_db_pool() as pool:
-            async with pool.acquire() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.execute("SELECT id, name FROM Roles")
-                    columns = [col[0] for col in cursor.description]
-                    roles = [dict(zip(columns, row)) for row in await cursor.fetchall()]
-                    return {"roles": roles}
+        return conditional_json(request, await reference_cache.get("roles", None, load))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/users/")
-async def get_users():
+async def get_users(
+    request: Request,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    after_id = parse_cursor(cursor)
+
+    async def load():
+        async with db_pool.connection() as conn:
+            async with conn.cursor() as db_cursor:
+                await db_cursor.execute("""
+                    SELECT u.id, u.name, u.surname, u.patronomic, u.role_id, 
+                           u.telephone, u.email, r.id as role_id
+                    FROM Users u
+                    LEFT JOIN Roles r ON u.role_id = r.id
+                    WHERE %s IS NULL OR u.id > %s
+                    ORDER BY u.id
+                    LIMIT %s
+                """, (after_id, after_id, limit + 1))
+                columns = [col[0] for col in db_cursor.description]
+                users, next_cursor = page(
+                    [dict(zip(columns, row)) for row in await db_cursor.fetchall()],
+                    limit
+                )
+                return {"users": users, "next_cursor": next_cursor}
+
     try:
-        async with await get_db_pool() as pool:
-            async with pool.acquire() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.execute("""
-                        SELECT u.id, u.name, u.surname, u.patronomic, u.role_id, 
-                               u.telephone, u.email, r.id as role_id
-                        FROM Users u
-                        LEFT JOIN Roles r ON u.role_id = r.id
-                    """)
-                    columns = [col[0] for col in cursor.description]
-                    users = [dict(zip(columns, row)) for row in await cursor.fetchall()]
-                    return {"users": users}
+        # Pages are cached per (limit, cursor) and dropped together on any user write
+        return conditional_json(request, await reference_cache.get("users", (limit, after_id), load))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/users/")
-async def create_user(user: UserCreate):
+async def create_user(user: UserCreate, conn=Depends(get_db)):
     try:
-        async with await get_db_pool() as pool:
-            async with pool.acquire() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.execute(
-                        """INSERT INTO Users 
-                        (name, surname, patronomic, role_id, telephone, email, password)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                        (user.name, user.surname, user.patronomic, user.role_id,
-                         user.telephone, user.email, user.password)
-                    )
-                    user_id = cursor.lastrowid
-                    await conn.commit()
-                    return {"status": "success", "user_id": user_id}
+        await conn.begin()
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                """INSERT INTO Users 
+                (name, surname, patronomic, role_id, telephone, email, password)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                (user.name, user.surname, user.patronomic, user.role_id,
+                 user.telephone, user.email, user.password)
+            )
+            user_id = cursor.lastrowid
+            await conn.commit()
+            reference_cache.invalidate("users")
+            return {"status": "success", "user_id": user_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -628,26 +1130,24 @@ async def create_yandex_task(board_data: TrackerBoardCreate):
         return {"status": "error"}
     
 @app.post("/download_doc")
-async def download_file(request: ConferenceRequest):
+async def download_file(request: ConferenceRequest, conn=Depends(get_db)):
     name = request.name
     print(name)
     try:
-        async with await get_db_pool() as pool:
-            async with pool.acquire() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.execute(
-                        "SELECT id FROM Conferences WHERE name = %s",
-                        (name,)
-                    )
-                    
-                    result = await cursor.fetchone()
-                    
-                    if not result:
-                        raise HTTPException(status_code=404, detail="Конференция не найдена")
-                    
-                    conference_id = result[0]
-                    
-                    protocol_data = create_protocol(conference_id, db_config=MYSQL_CONFIG)
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                "SELECT id FROM Conferences WHERE name = %s",
+                (name,)
+            )
+            
+            result = await cursor.fetchone()
+            
+            if not result:
+                raise HTTPException(status_code=404, detail="Конференция не найдена")
+            
+            conference_id = result[0]
+            
+            protocol_data = create_protocol(conference_id, db_config=MYSQL_CONFIG)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -663,6 +1163,9 @@ async def bot_notificate():
     # notificate()
     return {"status": "success"}
 
+if SERVER_ROLE == "all":
+    app.include_router(asr_router)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=8000)